@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+ldpc_bitpack.py
+
+Bit-packed storage for info bits and hard decisions, and XOR + popcount
+error counting over the packed words.
+
+BinarySource and LDPC5GDecoder(hard_out=True) return float32 tensors with
+one element per bit (32 bits of storage per bit). Packing 8 bits per byte
+cuts a cached [N, k] dataset 32x versus float32 (8x versus uint8), and
+counting errors becomes XOR + popcount over k/8 bytes per codeword.
+
+NumPy helpers (host side, cached datasets / shared-memory slots):
+    pack_bits, unpack_bits, count_errors, block_error_mask
+
+TensorFlow helpers (device side, run_ber_sweep):
+    tf_pack_bits, tf_count_errors
+    (TF is imported inside them, so NumPy-only users never load it)
+
+Bit order is MSB-first within each byte, matching np.packbits. When k is
+not a multiple of 8 the last byte is zero-padded, which never adds errors
+since both operands are padded the same way.
+
+The reference info bits should be packed once, when they are generated
+(ldpc_rng.ParallelGenerator.bits_packed returns its drawn bytes as-is);
+per batch only the decoder output then needs packing.
+
+Run standalone to time error counting against the unpacked
+not_equal + count_nonzero comparison, on the host and on a TF device:
+    (sionna-gpu) python3 ldpc_bitpack.py --num-codewords 65536 --device /GPU:0
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+
+# Popcount of every byte value; fallback for NumPy < 2.0 (no bitwise_count)
+_POPCOUNT_LUT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+# MSB-first bit weights within a byte
+_BIT_WEIGHTS = [128, 64, 32, 16, 8, 4, 2, 1]
+
+
+def packed_len(k: int) -> int:
+    """Bytes per codeword for k packed bits."""
+    return (k + 7) // 8
+
+
+def pack_bits(bits: np.ndarray) -> np.ndarray:
+    """Pack a [..., k] array of 0/1 values (any dtype) into [..., ceil(k/8)] uint8."""
+    return np.packbits(np.asarray(bits) != 0, axis=-1)
+
+
+def unpack_bits(packed: np.ndarray, k: int) -> np.ndarray:
+    """Inverse of pack_bits: [..., ceil(k/8)] uint8 -> [..., k] uint8 of 0/1."""
+    return np.unpackbits(packed, axis=-1, count=k)
+
+
+def _popcount_rows(x: np.ndarray) -> np.ndarray:
+    """Per-row popcount of a [..., nbytes] uint8 array, as int64."""
+    if hasattr(np, "bitwise_count"):
+        # Count over 64-bit words when rows are 8-byte aligned (k % 64 == 0)
+        if x.shape[-1] % 8 == 0 and x.flags.c_contiguous:
+            x = x.view(np.uint64)
+        return np.bitwise_count(x).sum(axis=-1, dtype=np.int64)
+    return _POPCOUNT_LUT[x].sum(axis=-1, dtype=np.int64)
+
+
+def count_errors(packed_a: np.ndarray, packed_b: np.ndarray) -> tuple[int, int]:
+    """
+    Bit and block errors between two packed [N, nbytes] arrays.
+
+    Returns (bit_errors, block_errors), where a block error is a codeword
+    with at least one wrong bit.
+    """
+    per_block = _popcount_rows(np.bitwise_xor(packed_a, packed_b))
+    return int(per_block.sum()), int(np.count_nonzero(per_block))
+
+
+def block_error_mask(packed_a: np.ndarray, packed_b: np.ndarray) -> np.ndarray:
+    """Boolean [N] mask of codewords with at least one wrong bit."""
+    return _popcount_rows(np.bitwise_xor(packed_a, packed_b)) > 0
+
+
+def tf_pack_bits(bits):
+    """TF version of pack_bits for [B, k] tensors; returns [B, ceil(k/8)] uint8."""
+    import tensorflow as tf
+
+    bits = tf.cast(tf.not_equal(bits, 0), tf.int32)
+    k = bits.shape[-1]
+    pad = (-k) % 8
+    if pad:
+        bits = tf.pad(bits, [[0, 0], [0, pad]])
+    bits = tf.reshape(bits, [-1, (k + pad) // 8, 8])
+    weights = tf.constant(_BIT_WEIGHTS, dtype=tf.int32)
+    return tf.cast(tf.reduce_sum(bits * weights, axis=-1), tf.uint8)
+
+
+def tf_count_errors(packed_a, packed_b):
+    """
+    TF version of count_errors; returns (bit_errors, block_errors) as int64
+    scalar tensors that stay on device until the caller reads them.
+    """
+    import tensorflow as tf
+
+    diff = tf.bitwise.bitwise_xor(packed_a, packed_b)
+    per_block = tf.reduce_sum(
+        tf.cast(tf.raw_ops.PopulationCount(x=diff), tf.int64), axis=-1
+    )
+    return tf.reduce_sum(per_block), tf.math.count_nonzero(per_block)
+
+
+# ----------------------------------------------------------------------
+# Standalone timing against the unpacked comparison
+# ----------------------------------------------------------------------
+
+def _time_ms(fn, repeat: int) -> float:
+    fn()                                             # warm-up / trace
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1e3
+
+
+def time_numpy(u: np.ndarray, u_hat: np.ndarray, repeat: int) -> dict:
+    u_packed = pack_bits(u)
+
+    def compare():
+        per_block = np.count_nonzero(u_hat != u, axis=-1)
+        return int(per_block.sum()), int(np.count_nonzero(per_block))
+
+    return {
+        "not_equal (unpacked)": _time_ms(compare, repeat),
+        "pack u_hat + u": _time_ms(
+            lambda: count_errors(pack_bits(u_hat), pack_bits(u)), repeat),
+        "pack u_hat, u pre-packed": _time_ms(
+            lambda: count_errors(pack_bits(u_hat), u_packed), repeat),
+    }
+
+
+def time_tf(u: np.ndarray, u_hat: np.ndarray, repeat: int, device: str) -> dict:
+    import tensorflow as tf
+
+    with tf.device(device):
+        u_t = tf.constant(u)
+        u_hat_t = tf.constant(u_hat)
+        u_packed_t = tf_pack_bits(u_t)
+
+        def run(fn):
+            # .numpy() on the counters syncs, as run_ber_sweep does per Eb/N0
+            return lambda: [x.numpy() for x in fn()]
+
+        def compare():
+            diff = tf.cast(tf.not_equal(u_hat_t, u_t), tf.int64)
+            per_block = tf.reduce_sum(diff, axis=-1)
+            return tf.reduce_sum(per_block), tf.math.count_nonzero(per_block)
+
+        return {
+            "not_equal (unpacked)": _time_ms(run(compare), repeat),
+            "pack u_hat + u": _time_ms(
+                run(lambda: tf_count_errors(tf_pack_bits(u_hat_t),
+                                            tf_pack_bits(u_t))), repeat),
+            "pack u_hat, u pre-packed": _time_ms(
+                run(lambda: tf_count_errors(tf_pack_bits(u_hat_t), u_packed_t)),
+                repeat),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time packed XOR + popcount error counting vs. not_equal."
+    )
+    parser.add_argument("--num-codewords", type=int, default=65536,
+                        help="Codewords per comparison.")
+    parser.add_argument("--k", type=int, default=512,
+                        help="Info bits per codeword.")
+    parser.add_argument("--ber", type=float, default=1e-3,
+                        help="Fraction of flipped bits in the decoded copy.")
+    parser.add_argument("--repeat", type=int, default=20,
+                        help="Timed calls per method.")
+    parser.add_argument("--device", type=str, default="/CPU:0",
+                        help="TF device for the TF timings.")
+    parser.add_argument("--no-tf", action="store_true",
+                        help="Skip the TensorFlow timings.")
+    parser.add_argument("--seed", type=int, default=1234,
+                        help="Seed for the random bits.")
+
+    cfg = parser.parse_args()
+
+    rng = np.random.default_rng(cfg.seed)
+    u = rng.integers(0, 2, size=(cfg.num_codewords, cfg.k)).astype(np.float32)
+    flips = rng.random(u.shape) < cfg.ber
+    u_hat = np.where(flips, 1.0 - u, u).astype(np.float32)
+
+    print(f"{cfg.num_codewords} codewords x k={cfg.k}, {int(flips.sum())} "
+          f"flipped bits; ms per error count (lower is better)")
+    print()
+
+    timings = {"NumPy": time_numpy(u, u_hat, cfg.repeat)}
+    if not cfg.no_tf:
+        timings[f"TF {cfg.device}"] = time_tf(u, u_hat, cfg.repeat, cfg.device)
+
+    for name, res in timings.items():
+        base = res["not_equal (unpacked)"]
+        print(f"=== {name} ===")
+        for method, ms in res.items():
+            print(f"{method:26s} {ms:9.3f} ms  ({base / ms:5.2f}x vs not_equal)")
+        print()
+
+
+if __name__ == "__main__":
+    main()
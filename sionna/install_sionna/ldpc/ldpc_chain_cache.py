@@ -0,0 +1,146 @@
+"""
+ldpc_chain_cache.py
+
+Bounded LRU cache of built LDPC5G codes, their decoders and the traced
+decode functions.
+
+Building an LDPC5GEncoder constructs the 5G base graph, lifting and
+parity-check structure; this depends only on (k, n, m), not on the
+decoder's iteration count. An LDPC5GDecoder is then a cheap wrapper
+around an encoder plus num_iter, and wrapping it in a new tf.function
+pays a fresh trace on first call. The cache mirrors that split:
+
+    codes    : (k, n, m)           -> source, const, mapper, demapper, encoder
+    decoders : (k, n, m, num_iter) -> decoder + one traced fn per TF device
+
+so sweeping num_iter rebuilds only the decoder, and revisiting a
+(code, num_iter) pair -- another batch size, Eb/N0 point, HARQ ladder
+step or repetition in the same process -- reuses the traced function.
+
+Used by ldpc_cpu_gpu_benchmark.py (including the in-process sweep in
+ldpc_sweep.py), ldpc_harq.py and sionna_e2e_ldpc_awgn.py (run_ber_sweep /
+MCS grid). Each script passes its own build_code / build_decoder:
+
+    cache = ChainCache(build_code, build_decoder, maxsize=8)
+    chain = cache.get(k=512, rate=0.5, m=4, num_iter=10)
+    decode = cache.decode_fn(chain, "/GPU:0")
+    with tf.device("/GPU:0"):
+        u_hat = decode(llr)
+"""
+
+from collections import OrderedDict
+
+import tensorflow as tf
+
+
+class ChainCache:
+    """
+    Two-level LRU cache: codes keyed by (k, n, m), decoders keyed by
+    (k, n, m, num_iter).
+
+    build_code_fn(k, rate, m) must return a chain dict without a decoder
+    (at least "encoder" and "n"); build_decoder_fn(encoder, num_iter) must
+    return the decoder. get() merges the two into the chain dict layout
+    used by build_chain in both scripts.
+
+    Each level holds at most maxsize entries. Evicting a code also drops
+    its decoders and their traced decode functions.
+    """
+
+    def __init__(self, build_code_fn, build_decoder_fn, maxsize: int = 8):
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1.")
+        self.build_code_fn = build_code_fn
+        self.build_decoder_fn = build_decoder_fn
+        self.maxsize = maxsize
+        self._codes: OrderedDict = OrderedDict()
+        self._decoders: OrderedDict = OrderedDict()
+        self.counts = {
+            "code": {"hits": 0, "misses": 0, "evictions": 0},
+            "decoder": {"hits": 0, "misses": 0, "evictions": 0},
+        }
+
+    @staticmethod
+    def code_key(k: int, rate: float, m: int) -> tuple:
+        # Same n as build_code, so 2/3 and 0.6666666666666666 share an entry
+        return (int(k), int(k / rate), int(m))
+
+    def _lookup(self, level: str, table: OrderedDict, key: tuple, build):
+        entry = table.get(key)
+        counts = self.counts[level]
+        if entry is not None:
+            counts["hits"] += 1
+            table.move_to_end(key)
+            return entry
+
+        counts["misses"] += 1
+        entry = table[key] = build()
+        if len(table) > self.maxsize:
+            old_key, _ = table.popitem(last=False)
+            counts["evictions"] += 1
+            if level == "code":
+                for dec_key in [d for d in self._decoders if d[:3] == old_key]:
+                    del self._decoders[dec_key]
+        return entry
+
+    def code(self, k: int, rate: float, m: int) -> dict:
+        """Cached code structure (no decoder), building it on a miss."""
+        return self._lookup("code", self._codes, self.code_key(k, rate, m),
+                            lambda: self.build_code_fn(k, rate, m))
+
+    def get(self, k: int, rate: float, m: int, num_iter: int) -> dict:
+        """
+        Chain dict for these parameters: the cached code plus a cached
+        decoder for num_iter. Only missing pieces are built.
+        """
+        code = self.code(k, rate, m)
+        dec_key = self.code_key(k, rate, m) + (int(num_iter),)
+        entry = self._lookup(
+            "decoder", self._decoders, dec_key,
+            lambda: {"decoder": self.build_decoder_fn(code["encoder"], num_iter),
+                     "decode_fns": {}},
+        )
+        # Shallow merge: the decode_fns dict is shared with the cache entry
+        return {**code, **entry, "num_iter": int(num_iter)}
+
+    def decode_fn(self, chain: dict, device_str: str):
+        """
+        Traced decode function for this chain's decoder on one device.
+
+        Created (and traced on first call) once per (decoder, device);
+        later calls with the same input shape reuse the concrete graph.
+        """
+        fns = chain.setdefault("decode_fns", {})
+        fn = fns.get(device_str)
+        if fn is None:
+            decoder = chain["decoder"]
+
+            @tf.function
+            def decode_once(llr_in):
+                return decoder(llr_in)
+
+            fn = fns[device_str] = decode_once
+        return fn
+
+    def __len__(self) -> int:
+        return len(self._decoders)
+
+    def __contains__(self, key: tuple) -> bool:
+        return key in self._codes or key in self._decoders
+
+    def stats(self) -> dict:
+        return {
+            "maxsize": self.maxsize,
+            "codes": len(self._codes),
+            "decoders": len(self._decoders),
+            **{f"{level}_{name}": value
+               for level, counts in self.counts.items()
+               for name, value in counts.items()},
+        }
+
+    def print_stats(self) -> None:
+        st = self.stats()
+        for level, size in (("code", st["codes"]), ("decoder", st["decoders"])):
+            print(f"Chain cache ({level + 's':8s}): {size}/{st['maxsize']} entries, "
+                  f"{st[level + '_hits']} hits, {st[level + '_misses']} misses, "
+                  f"{st[level + '_evictions']} evictions")
@@ -5,17 +5,30 @@ ldpc_cpu_gpu_benchmark.py
 Compare LDPC5G decode performance on Grace CPU (/CPU:0) and
 GB10 GPU (/GPU:0) using Sionna 1.2.1 PHY/SYS on DGX Spark.
 
-- Builds a 5G-style LDPC + 16-QAM + AWGN chain.
-- Generates one large dataset of LLRs.
+- Builds a 5G-style LDPC + 16-QAM + AWGN chain, with a selectable
+  demapper backend (--demapper, see ldpc_demappers.py).
+- Generates one large dataset of LLRs (optionally seeded and
+  multithreaded via ldpc_rng.ParallelGenerator, --seed).
 - Times ONLY the LDPC5G decode on CPU and GPU.
 - Reports latency, throughput (Mbit/s of info bits), and speedups.
+- Records the run's peak host RSS and, where TF supports it, peak
+  device memory per device.
+- Times startup phases separately: import, build_chain, dataset
+  generation, first-call tracing and warm decode.
+- Optionally checks decoded bits against the (bit-packed) info bits
+  with XOR + popcount (--check-errors).
 - Optionally appends results to a CSV file for sweeps/analytics.
+- Optional probe mode (--probe-max-batch) that finds the largest
+  num_codewords that fits under a memory cap (--mem-cap-mb).
 
 Run inside your sionna-gpu venv, e.g.:
     (sionna-gpu) python3 ldpc_cpu_gpu_benchmark.py \
         --num-codewords 8192 --num-iter 20 --repeat 10 \
         --csv-path ldpc_results.csv --label "grace_gb10_baseline"
 
+    (sionna-gpu) python3 ldpc_cpu_gpu_benchmark.py \
+        --num-iter 20 --probe-max-batch --mem-cap-mb 16384
+
 References:
     [1] J. Hoydis et al., "Sionna: An Open-Source Library for Next-Generation
         Physical Layer Research," arXiv:2203.11854, 2022.
@@ -30,10 +43,16 @@ References:
 import os
 os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"  # keep TF quiet-ish
 
+import time
+_IMPORT_T0 = time.perf_counter()
+
 import argparse
 import csv
+import functools
+import math
+import multiprocessing as mp
+import resource
 import socket
-import time
 from datetime import datetime
 
 import numpy as np
@@ -43,12 +62,19 @@ import sionna
 from sionna.phy.mapping import (
     Constellation,
     Mapper,
-    Demapper,
     BinarySource,
 )
 from sionna.phy.fec.ldpc import LDPC5GEncoder, LDPC5GDecoder
 from sionna.phy.utils import ebnodb2no
 
+from ldpc_bitpack import count_errors, pack_bits
+from ldpc_chain_cache import ChainCache
+from ldpc_demappers import DEMAPPER_BACKENDS, make_demapper
+from ldpc_rng import ParallelGenerator
+
+# Wall time spent importing TF / Sionna (the dominant startup cost)
+IMPORT_S = time.perf_counter() - _IMPORT_T0
+
 
 def configure_tf(cpu_threads: int | None = None):
     """Optional TF threading tweaks for Grace."""
@@ -60,6 +86,39 @@ def configure_tf(cpu_threads: int | None = None):
     tf.get_logger().setLevel("ERROR")
 
 
+def peak_host_rss_mb() -> float:
+    """
+    Peak resident set size of this process so far, in MiB.
+
+    ru_maxrss is a high-water mark over the whole process lifetime
+    (reported in KiB on Linux), so it never decreases between runs.
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def reset_device_memory_stats(device_str: str) -> None:
+    """Reset TF's peak-memory counter for a device, if supported."""
+    try:
+        tf.config.experimental.reset_memory_stats(device_str.lstrip("/"))
+    except (ValueError, AttributeError):
+        # CPU devices (and older TF builds) do not track memory stats
+        pass
+
+
+def peak_device_memory_mb(device_str: str) -> float:
+    """
+    Peak TF allocator usage on a device since the last reset, in MiB.
+
+    Returns NaN where tf.config.experimental.get_memory_info is not
+    supported (e.g. /CPU:0).
+    """
+    try:
+        info = tf.config.experimental.get_memory_info(device_str.lstrip("/"))
+    except (ValueError, AttributeError):
+        return float("nan")
+    return info["peak"] / (1024.0 * 1024.0)
+
+
 def print_env():
     print("=== Environment ===")
     print("Host      :", socket.gethostname())
@@ -70,6 +129,14 @@ def print_env():
     print()
 
 
+def sync_device():
+    """Block until all pending TF work has finished (no-op if unsupported)."""
+    try:
+        tf.experimental.async_wait()
+    except AttributeError:
+        pass
+
+
 def awgn_manual(x: tf.Tensor, no: tf.Tensor) -> tf.Tensor:
     """
     Complex AWGN with noise spectral density No (per complex dim).
@@ -82,35 +149,32 @@ def awgn_manual(x: tf.Tensor, no: tf.Tensor) -> tf.Tensor:
     return tf.cast(x, tf.complex64) + w
 
 
-def build_chain(k: int, rate: float, m: int, num_iter: int):
+def build_code(k: int, rate: float, m: int, demapper: str = "app"):
     """
-    Build the LDPC5G + 16-QAM chain.
+    Build the LDPC5G + 16-QAM chain up to the encoder (no decoder).
 
     k   : info bits per codeword
     rate: code rate (k/n)
     m   : bits per symbol (4 -> 16-QAM)
+    demapper: demapper backend, one of DEMAPPER_BACKENDS
     """
     n = int(k / rate)
     if n % m != 0:
         raise ValueError("n must be divisible by m for QAM mapping.")
 
-    print(f"Using LDPC5G with k={k}, n={n}, rate={rate:.3f}, M=2^{m}")
+    print(f"Using LDPC5G with k={k}, n={n}, rate={rate:.3f}, M=2^{m}, "
+          f"demapper={demapper}")
 
     source = BinarySource()
     const = Constellation("qam", num_bits_per_symbol=m)
     mapper = Mapper(constellation=const)
-    demapper = Demapper("app", constellation=const)
+    demapper = make_demapper(demapper, const)
 
     encoder = LDPC5GEncoder(
         k=k,
         n=n,
         num_bits_per_symbol=m,
     )
-    decoder = LDPC5GDecoder(
-        encoder,
-        hard_out=True,       # return hard bits
-        num_iter=num_iter,   # decoder iterations
-    )
 
     return {
         "source": source,
@@ -118,7 +182,6 @@ def build_chain(k: int, rate: float, m: int, num_iter: int):
         "mapper": mapper,
         "demapper": demapper,
         "encoder": encoder,
-        "decoder": decoder,
         "k": k,
         "n": n,
         "rate": rate,
@@ -126,14 +189,53 @@ def build_chain(k: int, rate: float, m: int, num_iter: int):
     }
 
 
+def build_decoder(encoder, num_iter: int):
+    """LDPC5G hard-decision decoder for an encoder's code."""
+    return LDPC5GDecoder(
+        encoder,
+        hard_out=True,       # return hard bits
+        num_iter=num_iter,   # decoder iterations
+    )
+
+
+def build_chain(k: int, rate: float, m: int, num_iter: int,
+                demapper: str = "app"):
+    """
+    Build the full LDPC5G + 16-QAM chain (code + decoder), uncached.
+
+    See build_code; ChainCache builds the two halves separately.
+    """
+    chain = build_code(k, rate, m, demapper=demapper)
+    chain["decoder"] = build_decoder(chain["encoder"], num_iter)
+    chain["num_iter"] = num_iter
+    return chain
+
+
+def make_chain_cache(demapper: str = "app", maxsize: int = 8) -> ChainCache:
+    """ChainCache over build_code / build_decoder for one demapper backend."""
+    return ChainCache(functools.partial(build_code, demapper=demapper),
+                      build_decoder, maxsize=maxsize)
+
+
 def generate_dataset(chain: dict,
                      num_codewords: int,
-                     ebno_db: float) -> tuple[np.ndarray, np.ndarray]:
+                     ebno_db: float,
+                     verbose: bool = True,
+                     rng: ParallelGenerator | None = None,
+                     packed: bool = False) -> tuple[np.ndarray, np.ndarray]:
     """
     Generate a dataset of (u, llr) using the full chain.
 
+    verbose=False suppresses the progress prints (for callers that generate
+    many small batches in a loop).
+    rng: if given, bits and AWGN come from this seeded ParallelGenerator
+         (reproducible, multithreaded) instead of BinarySource/awgn_manual.
+    packed: return the info bits bit-packed (ldpc_bitpack layout). With
+            rng these are the generator's own bytes, so nothing is repacked.
+
     Returns:
-        u_np   : shape [num_codewords, k]  (info bits)
+        u_np   : shape [num_codewords, k]  (info bits), or
+                 [num_codewords, ceil(k/8)] uint8 if packed
         llr_np : shape [num_codewords, n]  (LLRs for LDPC decoder)
     """
     source   = chain["source"]
@@ -149,53 +251,75 @@ def generate_dataset(chain: dict,
     ebno_tf = tf.constant(ebno_db, dtype=tf.float32)
     no = ebnodb2no(ebno_tf, num_bits_per_symbol=m, coderate=rate)
 
-    print(f"Generating dataset: num_codewords={num_codewords}, Eb/N0={ebno_db} dB")
+    if verbose:
+        print(f"Generating dataset: num_codewords={num_codewords}, Eb/N0={ebno_db} dB")
 
-    u = source([num_codewords, k])      # (B, k)
+    u_packed = None
+    if rng is None:
+        u = source([num_codewords, k])  # (B, k)
+    else:
+        u_bits, u_packed = rng.bits_packed(num_codewords, k)
+        u = tf.constant(u_bits)
+        del u_bits
     c = encoder(u)                      # (B, n)
     s = mapper(c)                       # (B, n/m) complex
-    y = awgn_manual(s, no)              # (B, n/m) complex
+    if rng is None:
+        y = awgn_manual(s, no)          # (B, n/m) complex
+    else:
+        w = rng.awgn((num_codewords, n // m), float(no.numpy()))
+        y = tf.cast(s, tf.complex64) + w
     llr = demapper(y, no)               # (B, n) LLRs
 
-    u_np = u.numpy()
+    if packed:
+        u_np = u_packed if u_packed is not None else pack_bits(u.numpy())
+    else:
+        u_np = u.numpy()
+    del u
     llr_np = llr.numpy()
-    print("Dataset shapes: u", u_np.shape, ", llr", llr_np.shape)
-    print()
+    if verbose:
+        print("Dataset shapes: u", u_np.shape, ", llr", llr_np.shape)
+        print()
     return u_np, llr_np
 
 
 def benchmark_device(device_str: str,
-                     decoder,
+                     decode_once,
                      llr_np: np.ndarray,
                      cfg) -> dict:
     """
     Time repeated LDPC5G decodes on a given TF device (CPU or GPU).
 
+    peak_rss_mb in the result is the process-lifetime host RSS high-water
+    mark, so it only describes this device when the process benchmarks a
+    single device (as the --probe-max-batch children do).
+
+    decode_once: traced decode function for this device, from
+                 ChainCache.decode_fn(chain, device_str).
+
     cfg: argparse.Namespace with fields:
          k, num_codewords, repeat
     """
     print(f"--- Benchmarking on {device_str} ---")
 
+    reset_device_memory_stats(device_str)
+
     llr_tf = tf.convert_to_tensor(llr_np, dtype=tf.float32)
 
     with tf.device(device_str):
         llr_dev = tf.identity(llr_tf)
 
-        @tf.function
-        def decode_once(llr_in):
-            return decoder(llr_in)
-
-        # Warm-up
+        # Warm-up: the first call traces and compiles the graph (unless the
+        # cached function was already traced for this shape)
+        t0 = time.perf_counter()
         _ = decode_once(llr_dev)
+        sync_device()
+        trace_s = time.perf_counter() - t0
 
         start = time.perf_counter()
         for _ in range(cfg.repeat):
             _ = decode_once(llr_dev)
         # Ensure all work is done before timing stops
-        try:
-            tf.experimental.async_wait()
-        except AttributeError:
-            pass
+        sync_device()
         end = time.perf_counter()
 
     elapsed = end - start
@@ -203,22 +327,83 @@ def benchmark_device(device_str: str,
     total_info_bits = cfg.num_codewords * cfg.k * cfg.repeat
     throughput_mbps = total_info_bits / elapsed / 1e6
 
+    peak_rss = peak_host_rss_mb()
+    peak_dev = peak_device_memory_mb(device_str)
+
+    print(f"First call (trace + decode): {trace_s:.6f} s")
     print(f"Total time: {elapsed:.6f} s for "
           f"{cfg.repeat} decodes of {cfg.num_codewords} codewords")
     print(f"Throughput: {throughput_mbps:.2f} Mbit/s (info bits)")
+    if not math.isnan(peak_dev):
+        print(f"Peak device memory: {peak_dev:.1f} MiB")
     print()
 
     return {
         "latency_s": avg_latency,
         "throughput_mbps": throughput_mbps,
+        "trace_s": trace_s,
+        "peak_rss_mb": peak_rss,
+        "peak_device_mem_mb": peak_dev,
+    }
+
+
+def check_errors(decode_once, u_packed: np.ndarray, llr_np: np.ndarray) -> dict:
+    """
+    Decode once on CPU and count bit / block errors against the packed
+    info bits (XOR + popcount over k/8 bytes per codeword).
+    """
+    with tf.device("/CPU:0"):
+        u_hat = decode_once(tf.convert_to_tensor(llr_np, dtype=tf.float32))
+    bit_err, block_err = count_errors(pack_bits(u_hat.numpy()), u_packed)
+    num_codewords, k = u_hat.shape
+    return {
+        "bit_errors": bit_err,
+        "block_errors": block_err,
+        "ber": bit_err / (num_codewords * k),
+        "bler": block_err / num_codewords,
     }
 
 
-def append_results_to_csv(csv_path: str, cfg, chain: dict, results: dict):
+def migrate_csv_header(csv_path: str, fieldnames: list[str]) -> list[str]:
+    """
+    Make an existing CSV's header cover fieldnames.
+
+    Returns the header to append with: the existing columns in their
+    order, followed by any of fieldnames they lack. If columns had to be
+    added, the file is rewritten (atomically, via a .tmp file) first.
+    """
+    with open(csv_path, newline="") as f:
+        reader = csv.DictReader(f)
+        existing = list(reader.fieldnames or [])
+        missing = [name for name in fieldnames if name not in existing]
+        if not missing:
+            return existing
+        rows = list(reader)
+
+    header = existing + missing
+    tmp_path = csv_path + ".tmp"
+    with open(tmp_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=header)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp_path, csv_path)
+
+    print(f"Migrated {csv_path} header: added {', '.join(missing)}")
+    return header
+
+
+def append_results_to_csv(csv_path: str,
+                          cfg,
+                          chain: dict,
+                          results: dict,
+                          phases: dict):
     """
     Append a single summary row (CPU + GPU) to a CSV file.
 
-    If the file does not exist or is empty, write a header first.
+    If the file does not exist or is empty, write a header first. If it
+    exists with an older header that lacks some of the current columns,
+    the file is first rewritten with the union of both headers (old rows
+    get empty cells in the new columns), so no field is ever dropped.
     """
     os.makedirs(os.path.dirname(csv_path) or ".", exist_ok=True)
 
@@ -240,9 +425,18 @@ def append_results_to_csv(csv_path: str, cfg, chain: dict, results: dict):
         "gpu_throughput_mbps",
         "latency_speedup_cpu_over_gpu",
         "throughput_speedup_gpu_over_cpu",
+        "peak_rss_mb",
+        "gpu_peak_mem_mb",
+        "import_s",
+        "build_chain_s",
+        "dataset_s",
+        "cpu_trace_s",
+        "gpu_trace_s",
     ]
 
     file_exists = os.path.exists(csv_path) and os.path.getsize(csv_path) > 0
+    if file_exists:
+        fieldnames = migrate_csv_header(csv_path, fieldnames)
 
     cpu_lat = results["cpu"]["latency_s"]
     cpu_thr = results["cpu"]["throughput_mbps"]
@@ -274,6 +468,15 @@ def append_results_to_csv(csv_path: str, cfg, chain: dict, results: dict):
         "gpu_throughput_mbps": gpu_thr,
         "latency_speedup_cpu_over_gpu": speedup_lat,
         "throughput_speedup_gpu_over_cpu": speedup_thr,
+        # One host figure per run: ru_maxrss spans the CPU and GPU passes
+        "peak_rss_mb": peak_host_rss_mb(),
+        "gpu_peak_mem_mb": results.get("gpu", {}).get("peak_device_mem_mb",
+                                                      float("nan")),
+        "import_s": phases["import_s"],
+        "build_chain_s": phases["build_chain_s"],
+        "dataset_s": phases["dataset_s"],
+        "cpu_trace_s": results["cpu"]["trace_s"],
+        "gpu_trace_s": results.get("gpu", {}).get("trace_s", float("nan")),
     }
 
     with open(csv_path, "a", newline="") as f:
@@ -285,6 +488,99 @@ def append_results_to_csv(csv_path: str, cfg, chain: dict, results: dict):
     print(f"Appended results to {csv_path}")
 
 
+def _probe_worker(device_str: str, cfg_dict: dict, num_codewords: int, queue):
+    """
+    Child-process body for one probe: build, generate, decode once.
+
+    Runs in a fresh (spawned) process so that the RSS high-water mark and
+    any OOM are confined to this single batch size.
+    """
+    gpus = tf.config.list_physical_devices("GPU")
+    for gpu in gpus:
+        try:
+            tf.config.experimental.set_memory_growth(gpu, True)
+        except RuntimeError:
+            pass
+    configure_tf(cpu_threads=cfg_dict["cpu_threads"])
+
+    cfg = argparse.Namespace(**cfg_dict)
+    cfg.num_codewords = num_codewords
+    cfg.repeat = 1
+
+    cache = make_chain_cache(cfg.demapper, maxsize=1)
+    chain = cache.get(k=cfg.k, rate=cfg.rate, m=cfg.m, num_iter=cfg.num_iter)
+    _, llr_np = generate_dataset(chain, num_codewords, cfg.ebno_db)
+    decode_once = cache.decode_fn(chain, device_str)
+    queue.put(benchmark_device(device_str, decode_once, llr_np, cfg))
+
+
+def probe_fits(device_str: str, cfg, num_codewords: int) -> tuple[bool, float]:
+    """
+    Run one probe in a child process.
+
+    Returns (fits, peak_mb). The peak is device memory where TF reports it,
+    otherwise host RSS. A crashed / OOM-killed child counts as not fitting.
+    """
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_probe_worker,
+                       args=(device_str, vars(cfg), num_codewords, queue))
+    proc.start()
+    proc.join()
+
+    if proc.exitcode != 0 or queue.empty():
+        print(f"[probe] {device_str} N={num_codewords}: "
+              f"failed (exit code {proc.exitcode})")
+        return False, float("nan")
+
+    res = queue.get()
+    peak = res["peak_device_mem_mb"]
+    if math.isnan(peak):
+        peak = res["peak_rss_mb"]
+
+    fits = peak <= cfg.mem_cap_mb
+    print(f"[probe] {device_str} N={num_codewords}: peak {peak:.1f} MiB "
+          f"({'fits' if fits else 'exceeds'} cap {cfg.mem_cap_mb:.0f} MiB)")
+    return fits, peak
+
+
+def probe_max_batch(device_str: str, cfg) -> int:
+    """
+    Find the largest num_codewords (multiple of --probe-step) that fits
+    under --mem-cap-mb on one device.
+
+    Doubles from --probe-step until a probe fails or --probe-limit is hit,
+    then bisects between the last fitting and first failing sizes.
+    Returns 0 if even the smallest probe does not fit.
+    """
+    step = cfg.probe_step
+    lo, hi = 0, None
+    n = step
+    while n <= cfg.probe_limit:
+        fits, _ = probe_fits(device_str, cfg, n)
+        if not fits:
+            hi = n
+            break
+        lo = n
+        n *= 2
+
+    if hi is None:
+        # Never failed below the limit
+        return lo
+
+    while hi - lo > step:
+        mid = (lo + hi) // 2 // step * step
+        if mid <= lo:
+            break
+        fits, _ = probe_fits(device_str, cfg, mid)
+        if fits:
+            lo = mid
+        else:
+            hi = mid
+
+    return lo
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="LDPC5G CPU vs GPU benchmark on DGX Spark (GB10) using Sionna."
@@ -311,29 +607,90 @@ def main():
                         help="If set, append results to this CSV file.")
     parser.add_argument("--label", type=str, default="",
                         help="Optional label for this run (experiment ID).")
+    parser.add_argument("--demapper", type=str, default="app",
+                        choices=DEMAPPER_BACKENDS,
+                        help="Demapper backend for dataset generation.")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Seed for reproducible, multithreaded dataset "
+                             "generation (default: unseeded TF path).")
+    parser.add_argument("--gen-threads", type=int, default=None,
+                        help="Threads for seeded generation (default: all cores).")
+    parser.add_argument("--check-errors", action="store_true",
+                        help="Report BER/BLER of the decoded bits (CPU decode).")
+    parser.add_argument("--chain-cache-size", type=int, default=8,
+                        help="Max codes / decoders kept in the LRU chain cache.")
+    parser.add_argument("--probe-max-batch", action="store_true",
+                        help="Find the largest num_codewords that fits under "
+                             "--mem-cap-mb instead of benchmarking.")
+    parser.add_argument("--mem-cap-mb", type=float, default=16384.0,
+                        help="Memory cap (MiB) for --probe-max-batch.")
+    parser.add_argument("--probe-step", type=int, default=1024,
+                        help="Batch-size granularity for --probe-max-batch.")
+    parser.add_argument("--probe-limit", type=int, default=1 << 20,
+                        help="Upper bound on num_codewords for --probe-max-batch.")
 
     cfg = parser.parse_args()
 
     configure_tf(cpu_threads=cfg.cpu_threads)
     print_env()
 
+    if cfg.probe_max_batch:
+        devices = ["/CPU:0"]
+        if not cfg.no_gpu and tf.config.list_physical_devices("GPU"):
+            devices.append("/GPU:0")
+
+        # One KEY=VALUE line per device so sweep scripts can source the output
+        max_batch = {dev: probe_max_batch(dev, cfg) for dev in devices}
+        print()
+        print("=== Max batch under memory cap ===")
+        for dev, n in max_batch.items():
+            name = dev.strip("/").split(":")[0]
+            print(f"MAX_NUM_CODEWORDS_{name}={n}")
+        return
+
+    phases = {"import_s": IMPORT_S}
+
+    cache = make_chain_cache(cfg.demapper, maxsize=cfg.chain_cache_size)
+
     # Build chain & dataset
-    chain = build_chain(k=cfg.k, rate=cfg.rate, m=cfg.m, num_iter=cfg.num_iter)
-    u_np, llr_np = generate_dataset(chain, cfg.num_codewords, cfg.ebno_db)
+    t0 = time.perf_counter()
+    chain = cache.get(k=cfg.k, rate=cfg.rate, m=cfg.m, num_iter=cfg.num_iter)
+    phases["build_chain_s"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    rng = None
+    if cfg.seed is not None:
+        rng = ParallelGenerator(cfg.seed, num_threads=cfg.gen_threads)
+    # Keep the info bits bit-packed; a float32 copy would be 32x larger
+    u_packed, llr_np = generate_dataset(chain, cfg.num_codewords, cfg.ebno_db,
+                                        rng=rng, packed=True)
+    phases["dataset_s"] = time.perf_counter() - t0
+    if rng is not None:
+        rng.close()
+
+    print(f"Info bits: {u_packed.nbytes / 2**20:.2f} MiB packed "
+          f"({cfg.num_codewords * cfg.k * 4 / 2**20:.2f} MiB as float32)")
+    print()
 
-    decoder = chain["decoder"]
     results: dict[str, dict] = {}
 
     # Grace CPU benchmark
-    results["cpu"] = benchmark_device("/CPU:0", decoder, llr_np, cfg)
+    results["cpu"] = benchmark_device(
+        "/CPU:0", cache.decode_fn(chain, "/CPU:0"), llr_np, cfg
+    )
 
     # GB10 GPU benchmark
     if not cfg.no_gpu and tf.config.list_physical_devices("GPU"):
-        results["gpu"] = benchmark_device("/GPU:0", decoder, llr_np, cfg)
+        results["gpu"] = benchmark_device(
+            "/GPU:0", cache.decode_fn(chain, "/GPU:0"), llr_np, cfg
+        )
     else:
         print("No GPU detected or --no-gpu set; skipping GPU benchmark.")
         print()
 
+    if cfg.check_errors:
+        err = check_errors(cache.decode_fn(chain, "/CPU:0"), u_packed, llr_np)
+
     # Summary to stdout
     print("=== Summary ===")
     cpu_lat = results["cpu"]["latency_s"]
@@ -356,9 +713,27 @@ def main():
     else:
         print("GPU results: N/A")
 
+    if cfg.check_errors:
+        print(f"Errors: {err['bit_errors']} bits (BER {err['ber']:.3e}), "
+              f"{err['block_errors']} blocks (BLER {err['bler']:.3e})")
+
+    print()
+    print("=== Phase timings ===")
+    print(f"Import (TF/Sionna)  : {phases['import_s']:.3f} s")
+    print(f"build_chain         : {phases['build_chain_s']:.3f} s")
+    print(f"Dataset generation  : {phases['dataset_s']:.3f} s")
+    for dev, res in results.items():
+        print(f"{dev.upper()} first call      : {res['trace_s']:.3f} s")
+        print(f"{dev.upper()} warm decode     : {res['latency_s']:.6f} s")
+    print()
+
+    print(f"Peak host RSS (whole run, CPU + GPU passes): {peak_host_rss_mb():.1f} MiB")
+    if "gpu" in results and not math.isnan(results["gpu"]["peak_device_mem_mb"]):
+        print(f"Peak GPU memory: {results['gpu']['peak_device_mem_mb']:.1f} MiB")
+
     # Optional CSV logging
     if cfg.csv_path:
-        append_results_to_csv(cfg.csv_path, cfg, chain, results)
+        append_results_to_csv(cfg.csv_path, cfg, chain, results, phases)
 
     print("\nDone.")
 
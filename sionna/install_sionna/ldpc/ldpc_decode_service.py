@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+ldpc_decode_service.py
+
+Local LDPC5G decode service with dynamic batching, plus an open-loop
+load generator, to find the batching policy with the best latency /
+throughput trade-off for many small decode requests on the Grace CPU.
+
+Two subcommands:
+
+  serve : asyncio server on a Unix socket. Requests (one or more codewords
+          of LLRs) are queued and decoded together once either
+          --max-batch codewords are waiting or the oldest request has
+          waited --max-wait-ms. The decoder is the build_chain /
+          ChainCache chain from ldpc_cpu_gpu_benchmark.py. Batches are
+          zero-padded to power-of-two sizes so the traced decoder only
+          sees a handful of shapes.
+
+  load  : open-loop client. Sends requests with Poisson arrivals at each
+          offered load in --rates-rps (independent of responses), then
+          reports latency percentiles and achieved throughput per load.
+
+Wire format (little-endian):
+  on connect, server -> client : k, n, max_batch (uint32), max_wait_ms (float32)
+  request                      : req_id, num_llrs (uint32), float32[num_llrs]
+  response                     : req_id, num_bits (uint32), uint8[num_bits]
+  num_llrs must be a multiple of n; the response has k hard bits per codeword.
+
+Example (two shells, inside the sionna-gpu venv):
+    (sionna-gpu) python3 ldpc_decode_service.py serve \
+        --socket /tmp/ldpc.sock --max-batch 256 --max-wait-ms 2
+    (sionna-gpu) python3 ldpc_decode_service.py load \
+        --socket /tmp/ldpc.sock --rates-rps 500 1000 2000 4000 \
+        --duration 10 --csv-path ldpc_service.csv
+"""
+
+import argparse
+import asyncio
+import csv
+import os
+import socket
+import struct
+import time
+from datetime import datetime
+
+import numpy as np
+
+
+HELLO = struct.Struct("<IIIf")
+HEADER = struct.Struct("<II")
+
+
+# ----------------------------------------------------------------------
+# Server
+# ----------------------------------------------------------------------
+
+def bucket_size(num_codewords: int, max_batch: int) -> int:
+    """Smallest power of two >= num_codewords, capped at max_batch."""
+    size = 1
+    while size < num_codewords:
+        size *= 2
+    return max(min(size, max_batch), num_codewords)
+
+
+class DecodeServer:
+    """Dynamic-batching decode server around one LDPC5G chain."""
+
+    def __init__(self, cfg):
+        # TF / Sionna are only needed on the server side
+        import tensorflow as tf
+        from ldpc_cpu_gpu_benchmark import configure_tf, make_chain_cache
+
+        configure_tf(cpu_threads=cfg.cpu_threads)
+        self.tf = tf
+        self.cfg = cfg
+
+        cache = make_chain_cache(maxsize=1)
+        self.chain = cache.get(k=cfg.k, rate=cfg.rate, m=cfg.m, num_iter=cfg.num_iter)
+        self.decode_once = cache.decode_fn(self.chain, cfg.device)
+        self.k = self.chain["k"]
+        self.n = self.chain["n"]
+
+        self.queue: asyncio.Queue = asyncio.Queue()
+        # Request that did not fit in the previous batch; it starts the next
+        self.held = None
+        self.num_batches = 0
+        self.num_requests = 0
+        self.num_codewords = 0
+        self.busy_s = 0.0
+
+    def warm_up(self) -> None:
+        """Trace the decoder for every bucket size before accepting load."""
+        size = 1
+        while True:
+            self._decode(np.zeros((size, self.n), dtype=np.float32))
+            if size >= self.cfg.max_batch:
+                break
+            size = min(size * 2, self.cfg.max_batch)
+
+    def _decode(self, llr: np.ndarray) -> np.ndarray:
+        """Blocking decode of one padded batch; runs in a worker thread."""
+        with self.tf.device(self.cfg.device):
+            u_hat = self.decode_once(self.tf.convert_to_tensor(llr))
+        return u_hat.numpy().astype(np.uint8)
+
+    async def handle_client(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> None:
+        writer.write(HELLO.pack(self.k, self.n, self.cfg.max_batch,
+                                self.cfg.max_wait_ms))
+        await writer.drain()
+
+        try:
+            while True:
+                req_id, num_llrs = HEADER.unpack(await reader.readexactly(HEADER.size))
+                payload = await reader.readexactly(num_llrs * 4)
+                if num_llrs == 0 or num_llrs % self.n != 0:
+                    print(f"Bad request {req_id}: {num_llrs} LLRs is not a "
+                          f"multiple of n={self.n}; closing connection.")
+                    break
+                llr = np.frombuffer(payload, dtype=np.float32).reshape(-1, self.n)
+                await self.queue.put((req_id, llr, writer, time.monotonic()))
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def batcher(self) -> None:
+        """
+        Collect queued requests into batches and decode them.
+
+        A batch never exceeds max_batch codewords (so it always lands on a
+        traced bucket size): a request that would overflow it is held back
+        and starts the next batch instead.
+        """
+        loop = asyncio.get_running_loop()
+        max_batch = self.cfg.max_batch
+        max_wait = self.cfg.max_wait_ms / 1e3
+
+        while True:
+            if self.held is not None:
+                first, self.held = self.held, None
+            else:
+                first = await self.queue.get()
+            batch = [first]
+            count = first[1].shape[0]
+            deadline = first[3] + max_wait
+
+            while count < max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if count + item[1].shape[0] > max_batch:
+                    self.held = item
+                    break
+                batch.append(item)
+                count += item[1].shape[0]
+
+            # A single oversized request is decoded on its own, unpadded
+            llr = np.concatenate([item[1] for item in batch], axis=0)
+            padded = bucket_size(count, max_batch)
+            if padded > count:
+                llr = np.concatenate(
+                    [llr, np.zeros((padded - count, self.n), dtype=np.float32)]
+                )
+
+            t0 = time.perf_counter()
+            u_hat = await loop.run_in_executor(None, self._decode, llr)
+            self.busy_s += time.perf_counter() - t0
+
+            offset = 0
+            for req_id, req_llr, writer, _ in batch:
+                rows = req_llr.shape[0]
+                bits = u_hat[offset:offset + rows].tobytes()
+                offset += rows
+                if writer.is_closing():
+                    continue
+                writer.write(HEADER.pack(req_id, len(bits)) + bits)
+
+            self.num_batches += 1
+            self.num_requests += len(batch)
+            self.num_codewords += count
+
+    def print_stats(self) -> None:
+        if self.num_batches == 0:
+            print("No batches decoded.")
+            return
+        print("=== Server stats ===")
+        print(f"Requests      : {self.num_requests}")
+        print(f"Batches       : {self.num_batches}")
+        print(f"Mean batch    : {self.num_codewords / self.num_batches:.1f} codewords")
+        print(f"Decoder busy  : {self.busy_s:.3f} s")
+
+
+async def serve(cfg) -> None:
+    server = DecodeServer(cfg)
+    print(f"Warming up decoder on {cfg.device} "
+          f"(k={server.k}, n={server.n}, max_batch={cfg.max_batch}) ...")
+    server.warm_up()
+
+    if os.path.exists(cfg.socket):
+        os.unlink(cfg.socket)
+
+    batcher = asyncio.create_task(server.batcher())
+    srv = await asyncio.start_unix_server(server.handle_client, path=cfg.socket)
+    print(f"Serving on {cfg.socket} (max_wait={cfg.max_wait_ms} ms). Ctrl-C to stop.")
+
+    try:
+        async with srv:
+            await srv.serve_forever()
+    finally:
+        batcher.cancel()
+        server.print_stats()
+        if os.path.exists(cfg.socket):
+            os.unlink(cfg.socket)
+
+
+# ----------------------------------------------------------------------
+# Load generator
+# ----------------------------------------------------------------------
+
+class Connection:
+    """
+    One client connection with pipelined, id-matched requests.
+
+    A single read_responses task per connection runs for the whole sweep,
+    so a response is never cut between header and body. Responses whose
+    id is no longer pending (timed out, or from an earlier load) are read
+    in full and dropped.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.pending: dict[int, asyncio.Future] = {}
+
+    async def read_responses(self) -> None:
+        try:
+            while True:
+                req_id, num_bits = HEADER.unpack(
+                    await self.reader.readexactly(HEADER.size)
+                )
+                await self.reader.readexactly(num_bits)
+                fut = self.pending.pop(req_id, None)
+                if fut is not None and not fut.done():
+                    fut.set_result(time.perf_counter())
+        except (asyncio.IncompleteReadError, ConnectionResetError) as e:
+            for fut in self.pending.values():
+                if not fut.done():
+                    fut.set_exception(e)
+
+
+async def open_connections(path: str, count: int) -> tuple[list, dict]:
+    conns = []
+    hello = None
+    for _ in range(count):
+        reader, writer = await asyncio.open_unix_connection(path)
+        k, n, max_batch, max_wait_ms = HELLO.unpack(
+            await reader.readexactly(HELLO.size)
+        )
+        hello = {"k": k, "n": n, "max_batch": max_batch, "max_wait_ms": max_wait_ms}
+        conns.append(Connection(reader, writer))
+    return conns, hello
+
+
+def percentile_ms(lat_ms: np.ndarray, q: float) -> float:
+    return float(np.percentile(lat_ms, q)) if lat_ms.size else float("nan")
+
+
+async def run_load(conns: list,
+                   hello: dict,
+                   rate_rps: float,
+                   cfg,
+                   id_base: int = 0) -> dict:
+    """
+    Open-loop run at one offered load; returns latency/throughput stats.
+
+    Send times follow a Poisson process fixed in advance, so slow responses
+    do not slow down the offered load, and latency is measured from each
+    request's scheduled send time rather than from when it was actually
+    written, so a stalled sender is charged to latency (no coordinated
+    omission). Request ids start at id_base so late replies from an
+    earlier load cannot be mistaken for this one's; the connections'
+    reader tasks must already be running.
+    """
+    loop = asyncio.get_running_loop()
+    rng = np.random.default_rng(cfg.seed)
+    n = hello["n"]
+    rows = cfg.codewords_per_request
+
+    # A small pool of random LLR payloads; content does not affect decode time
+    payloads = [
+        rng.normal(0.0, 4.0, size=(rows, n)).astype(np.float32).tobytes()
+        for _ in range(16)
+    ]
+
+    num_requests = max(1, int(rate_rps * cfg.duration))
+    gaps = rng.exponential(1.0 / rate_rps, size=num_requests)
+    send_at = np.cumsum(gaps)
+
+    sent: list[tuple[float, Connection, int, asyncio.Future]] = []
+    t_start = time.perf_counter()
+    for i, offset in enumerate(send_at):
+        delay = t_start + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        conn = conns[i % len(conns)]
+        req_id = id_base + i
+        fut = loop.create_future()
+        conn.pending[req_id] = fut
+        payload = payloads[i % len(payloads)]
+        conn.writer.write(HEADER.pack(req_id, rows * n) + payload)
+        sent.append((t_start + offset, conn, req_id, fut))
+
+    for c in conns:
+        await c.writer.drain()
+
+    latencies = []
+    errors = 0
+    for t_sched, conn, req_id, fut in sent:
+        try:
+            t_done = await asyncio.wait_for(fut, cfg.timeout)
+            latencies.append(t_done - t_sched)
+        except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+            # A late reply for this id is now stale and will be dropped
+            conn.pending.pop(req_id, None)
+            errors += 1
+    t_end = time.perf_counter()
+
+    lat_ms = np.array(latencies) * 1e3
+    elapsed = t_end - t_start
+    done = len(latencies)
+
+    return {
+        "offered_rps": rate_rps,
+        "achieved_rps": done / elapsed,
+        "throughput_mbps": done * rows * hello["k"] / elapsed / 1e6,
+        "requests": num_requests,
+        "errors": errors,
+        "p50_ms": percentile_ms(lat_ms, 50),
+        "p90_ms": percentile_ms(lat_ms, 90),
+        "p99_ms": percentile_ms(lat_ms, 99),
+        "p999_ms": percentile_ms(lat_ms, 99.9),
+        "mean_ms": float(lat_ms.mean()) if done else float("nan"),
+    }
+
+
+def append_load_to_csv(csv_path: str, cfg, hello: dict, res: dict) -> None:
+    """Append one offered-load row (with the server's batching policy)."""
+    os.makedirs(os.path.dirname(csv_path) or ".", exist_ok=True)
+    row = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "host": socket.gethostname(),
+        "label": cfg.label,
+        "k": hello["k"],
+        "n": hello["n"],
+        "max_batch": hello["max_batch"],
+        "max_wait_ms": hello["max_wait_ms"],
+        "codewords_per_request": cfg.codewords_per_request,
+        **res,
+    }
+    file_exists = os.path.exists(csv_path) and os.path.getsize(csv_path) > 0
+    with open(csv_path, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(row))
+        if not file_exists:
+            writer.writeheader()
+        writer.writerow(row)
+
+
+async def load(cfg) -> None:
+    conns, hello = await open_connections(cfg.socket, cfg.connections)
+    print(f"Connected to {cfg.socket}: k={hello['k']}, n={hello['n']}, "
+          f"max_batch={hello['max_batch']}, max_wait={hello['max_wait_ms']:.2f} ms")
+    print(f"{cfg.connections} connections, "
+          f"{cfg.codewords_per_request} codeword(s) per request")
+    print()
+    print(f"{'offered':>9s} {'achieved':>9s} {'Mbit/s':>9s} {'p50':>8s} "
+          f"{'p90':>8s} {'p99':>8s} {'p99.9':>8s} {'err':>5s}")
+
+    # One reader per connection for the whole sweep (see Connection)
+    readers = [asyncio.create_task(c.read_responses()) for c in conns]
+
+    id_base = 0
+    for rate_rps in cfg.rates_rps:
+        res = await run_load(conns, hello, rate_rps, cfg, id_base=id_base)
+        id_base += res["requests"]
+        print(f"{res['offered_rps']:9.0f} {res['achieved_rps']:9.0f} "
+              f"{res['throughput_mbps']:9.2f} {res['p50_ms']:8.2f} "
+              f"{res['p90_ms']:8.2f} {res['p99_ms']:8.2f} "
+              f"{res['p999_ms']:8.2f} {res['errors']:5d}")
+        if cfg.csv_path:
+            append_load_to_csv(cfg.csv_path, cfg, hello, res)
+
+    for c in conns:
+        c.writer.close()
+    for r in readers:
+        r.cancel()
+    await asyncio.gather(*readers, return_exceptions=True)
+
+    if cfg.csv_path:
+        print(f"\nAppended results to {cfg.csv_path}")
+
+
+# ----------------------------------------------------------------------
+# Main
+# ----------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="LDPC5G decode service with dynamic batching + load generator."
+    )
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_srv = sub.add_parser("serve", help="Run the batching decode server.")
+    p_srv.add_argument("--socket", type=str, default="/tmp/ldpc_decode.sock",
+                       help="Unix socket path to listen on.")
+    p_srv.add_argument("--k", type=int, default=512,
+                       help="Number of information bits per codeword (k).")
+    p_srv.add_argument("--rate", type=float, default=0.5,
+                       help="LDPC code rate (k/n).")
+    p_srv.add_argument("--m", type=int, default=4,
+                       help="Bits per QAM symbol (4 -> 16-QAM).")
+    p_srv.add_argument("--num-iter", type=int, default=10,
+                       help="Number of LDPC decoder iterations.")
+    p_srv.add_argument("--device", type=str, default="/CPU:0",
+                       help="TF device for decoding.")
+    p_srv.add_argument("--cpu-threads", type=int, default=None,
+                       help="Optional: limit TF CPU threads (Grace).")
+    p_srv.add_argument("--max-batch", type=int, default=256,
+                       help="Max codewords per decode batch.")
+    p_srv.add_argument("--max-wait-ms", type=float, default=2.0,
+                       help="Max time the oldest request waits for a batch to fill.")
+
+    p_load = sub.add_parser("load", help="Run the open-loop load generator.")
+    p_load.add_argument("--socket", type=str, default="/tmp/ldpc_decode.sock",
+                        help="Unix socket path of the server.")
+    p_load.add_argument("--rates-rps", type=float, nargs="+",
+                        default=[250, 500, 1000, 2000],
+                        help="Offered loads (requests/s) to sweep.")
+    p_load.add_argument("--duration", type=float, default=10.0,
+                        help="Seconds of arrivals per offered load.")
+    p_load.add_argument("--codewords-per-request", type=int, default=1,
+                        help="Codewords carried by each request.")
+    p_load.add_argument("--connections", type=int, default=8,
+                        help="Number of client connections.")
+    p_load.add_argument("--timeout", type=float, default=30.0,
+                        help="Per-request timeout in seconds.")
+    p_load.add_argument("--seed", type=int, default=0,
+                        help="Seed for arrival times and LLR payloads.")
+    p_load.add_argument("--csv-path", type=str, default=None,
+                        help="If set, append one row per offered load.")
+    p_load.add_argument("--label", type=str, default="",
+                        help="Optional label for this run (experiment ID).")
+
+    cfg = parser.parse_args()
+
+    try:
+        if cfg.cmd == "serve":
+            asyncio.run(serve(cfg))
+        else:
+            asyncio.run(load(cfg))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+ldpc_demappers.py
+
+Selectable demapper backends for LLR dataset generation.
+
+Sionna's Demapper("app") evaluates a log-sum-exp over all 2^m
+constellation points per symbol (16 for 16-QAM). For square QAM whose
+bit labels split into real-axis and imaginary-axis bits (Sionna's QAM
+does), the APP LLR factorises exactly across the two axes under AWGN, so
+each bit only needs its own axis' sqrt(2^m) PAM levels (4 for 16-QAM).
+
+Backends (make_demapper):
+    "app"        : Sionna Demapper("app")      -- exact, reference
+    "maxlog"     : Sionna Demapper("maxlog")   -- max instead of log-sum-exp
+    "sep-app"    : per-axis LUT, exact log-sum-exp over the PAM levels
+    "sep-maxlog" : per-axis LUT, max-log over the PAM levels
+
+The per-axis tables (PAM levels and the bit value each level carries) are
+read off const.points at construction, so no labeling is hard-coded; a
+constellation that is not separable raises ValueError.
+
+Run standalone to compare demapping speed, LLR difference and BER
+against "app" on one seeded dataset:
+    (sionna-gpu) python3 ldpc_demappers.py --num-codewords 16384 --ebno-db 3
+"""
+
+import argparse
+import time
+
+import numpy as np
+import tensorflow as tf
+from sionna.phy.mapping import Demapper
+
+
+DEMAPPER_BACKENDS = ("app", "maxlog", "sep-app", "sep-maxlog")
+
+
+class SeparableQAMDemapper:
+    """
+    Per-axis LLR demapper for square QAM.
+
+    LLR convention matches Sionna: llr = ln P(b=1 | y) - ln P(b=0 | y).
+    Callable as demapper(y, no) with y complex [..., S] and scalar No;
+    returns float32 LLRs [..., S * m] in the constellation's bit order.
+    """
+
+    def __init__(self, const, method: str = "app"):
+        if method not in ("app", "maxlog"):
+            raise ValueError(f"Unknown method '{method}'.")
+        self.method = method
+
+        points = np.asarray(const.points)
+        m = int(np.log2(points.size))
+        labels = (np.arange(points.size)[:, None] >> np.arange(m - 1, -1, -1)) & 1
+
+        re_levels = np.unique(np.round(points.real, 6))
+        im_levels = np.unique(np.round(points.imag, 6))
+        re_idx = np.searchsorted(re_levels, np.round(points.real, 6))
+        im_idx = np.searchsorted(im_levels, np.round(points.imag, 6))
+
+        # Assign each bit to the axis that alone determines it
+        axis_bits = {0: [], 1: []}
+        tables = {0: [], 1: []}
+        for j in range(m):
+            for axis, idx, levels in ((0, re_idx, re_levels), (1, im_idx, im_levels)):
+                table = np.full(levels.size, -1)
+                consistent = True
+                for p, lvl in enumerate(idx):
+                    if table[lvl] not in (-1, labels[p, j]):
+                        consistent = False
+                        break
+                    table[lvl] = labels[p, j]
+                if consistent:
+                    axis_bits[axis].append(j)
+                    tables[axis].append(table)
+                    break
+            else:
+                raise ValueError(
+                    f"Constellation is not separable: bit {j} depends on both axes."
+                )
+
+        # Output position of each (axis, bit) column after concatenating
+        # [real-axis bits, imag-axis bits]
+        order = axis_bits[0] + axis_bits[1]
+        self.perm = tf.constant(np.argsort(order), dtype=tf.int32)
+        self.m = m
+
+        self.levels = [tf.constant(re_levels, tf.float32),
+                       tf.constant(im_levels, tf.float32)]
+        # Log-masks [L, bits_on_axis]: 0 where the level carries bit=1 (or
+        # bit=0), -inf elsewhere
+        self.mask1, self.mask0 = [], []
+        for axis in (0, 1):
+            t = np.stack(tables[axis], axis=1)
+            self.mask1.append(tf.constant(np.where(t == 1, 0.0, -np.inf), tf.float32))
+            self.mask0.append(tf.constant(np.where(t == 0, 0.0, -np.inf), tf.float32))
+
+    def _axis_llr(self, y_axis, no, axis):
+        # [..., S, L, 1] metric against this axis' PAM levels
+        metric = -tf.square(y_axis[..., None] - self.levels[axis]) / no
+        metric = metric[..., None]
+        if self.method == "app":
+            reduce = tf.reduce_logsumexp
+        else:
+            reduce = tf.reduce_max
+        l1 = reduce(metric + self.mask1[axis], axis=-2)
+        l0 = reduce(metric + self.mask0[axis], axis=-2)
+        return l1 - l0                                   # [..., S, bits_on_axis]
+
+    def __call__(self, y, no):
+        y = tf.cast(y, tf.complex64)
+        no = tf.cast(no, tf.float32)
+        llr = tf.concat([
+            self._axis_llr(tf.math.real(y), no, 0),
+            self._axis_llr(tf.math.imag(y), no, 1),
+        ], axis=-1)                                      # [..., S, m]
+        llr = tf.gather(llr, self.perm, axis=-1)
+        new_shape = tf.concat([tf.shape(llr)[:-2], [-1]], axis=0)
+        return tf.reshape(llr, new_shape)                # [..., S * m]
+
+
+def make_demapper(backend: str, const):
+    """Demapper for one of DEMAPPER_BACKENDS."""
+    if backend in ("app", "maxlog"):
+        return Demapper(backend, constellation=const)
+    if backend in ("sep-app", "sep-maxlog"):
+        return SeparableQAMDemapper(const, method=backend.split("-", 1)[1])
+    raise ValueError(f"Unknown demapper backend '{backend}'; "
+                     f"choose from {DEMAPPER_BACKENDS}.")
+
+
+# ----------------------------------------------------------------------
+# Standalone comparison against "app"
+# ----------------------------------------------------------------------
+
+def main():
+    from sionna.phy.utils import ebnodb2no
+
+    from ldpc_bitpack import count_errors, pack_bits
+    from ldpc_cpu_gpu_benchmark import build_chain, configure_tf
+    from ldpc_rng import ParallelGenerator
+
+    parser = argparse.ArgumentParser(
+        description="Compare demapper backends against Sionna's 'app' demapper."
+    )
+    parser.add_argument("--k", type=int, default=512,
+                        help="Number of information bits per codeword (k).")
+    parser.add_argument("--rate", type=float, default=0.5,
+                        help="LDPC code rate (k/n).")
+    parser.add_argument("--m", type=int, default=4,
+                        help="Bits per QAM symbol (4 -> 16-QAM).")
+    parser.add_argument("--num-codewords", type=int, default=16384,
+                        help="Codewords in the comparison dataset.")
+    parser.add_argument("--ebno-db", type=float, default=3.0,
+                        help="Eb/N0 in dB.")
+    parser.add_argument("--num-iter", type=int, default=10,
+                        help="Number of LDPC decoder iterations.")
+    parser.add_argument("--repeat", type=int, default=10,
+                        help="Timed demapper calls per backend.")
+    parser.add_argument("--device", type=str, default="/CPU:0",
+                        help="TF device for demapping and decoding.")
+    parser.add_argument("--seed", type=int, default=1234,
+                        help="Seed for the shared dataset.")
+    parser.add_argument("--cpu-threads", type=int, default=None,
+                        help="Optional: limit TF CPU threads (Grace).")
+
+    cfg = parser.parse_args()
+    configure_tf(cpu_threads=cfg.cpu_threads)
+
+    chain = build_chain(k=cfg.k, rate=cfg.rate, m=cfg.m, num_iter=cfg.num_iter)
+    n, m = chain["n"], chain["m"]
+    no = ebnodb2no(tf.constant(cfg.ebno_db, tf.float32),
+                   num_bits_per_symbol=m, coderate=cfg.rate)
+
+    # One shared noisy dataset for all backends
+    rng = ParallelGenerator(cfg.seed)
+    u_np, u_packed = rng.bits_packed(cfg.num_codewords, cfg.k)
+    s = chain["mapper"](chain["encoder"](tf.constant(u_np)))
+    y = s + rng.awgn((cfg.num_codewords, n // m), float(no.numpy()))
+    rng.close()
+
+    print(f"\nDataset: {cfg.num_codewords} codewords, Eb/N0={cfg.ebno_db} dB, "
+          f"device {cfg.device}\n")
+    print(f"{'backend':>11s} {'ms/call':>9s} {'speedup':>8s} {'mean|dLLR|':>11s} "
+          f"{'max|dLLR|':>10s} {'rel.RMS':>8s} {'BER':>10s} {'BLER':>10s}")
+
+    ref = None
+    ref_ms = None
+    with tf.device(cfg.device):
+        y_dev = tf.identity(y)
+        for backend in DEMAPPER_BACKENDS:
+            demap = tf.function(make_demapper(backend, chain["const"]))
+            llr = demap(y_dev, no)                       # trace + warm-up
+            t0 = time.perf_counter()
+            for _ in range(cfg.repeat):
+                llr = demap(y_dev, no)
+            llr_np = llr.numpy()
+            ms = (time.perf_counter() - t0) / cfg.repeat * 1e3
+
+            if ref is None:
+                ref, ref_ms = llr_np, ms
+            diff = np.abs(llr_np - ref)
+            rel_rms = np.sqrt(np.mean(diff ** 2) / np.mean(ref ** 2))
+
+            u_hat = chain["decoder"](tf.constant(llr_np)).numpy()
+            bit_err, blk_err = count_errors(pack_bits(u_hat), u_packed)
+
+            print(f"{backend:>11s} {ms:9.3f} {ref_ms / ms:7.2f}x {diff.mean():11.4f} "
+                  f"{diff.max():10.4f} {rel_rms:8.4f} "
+                  f"{bit_err / u_np.size:10.3e} {blk_err / cfg.num_codewords:10.3e}")
+
+
+if __name__ == "__main__":
+    main()
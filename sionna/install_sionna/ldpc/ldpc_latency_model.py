@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+ldpc_latency_model.py
+
+Fit an analytic per-device latency model to the LDPC sweep results
+written by ldpc_cpu_gpu_benchmark.py (ldpc_sionna_spark.csv).
+
+Model (one fit per device, least squares on relative error):
+
+    latency_s = t_fixed + t_cw * (N * n) + t_iter * (N * n * num_iter)
+
+    N        : num_codewords in the batch
+    n        : codeword length (k / rate)
+    num_iter : LDPC decoder iterations
+
+t_fixed captures launch / dispatch overhead, t_cw the per-code-bit cost
+that does not depend on the iteration count (LLR load, hard decision),
+and t_iter the per-code-bit, per-iteration message-passing cost.
+
+From the fitted models the script:
+
+- reports fit quality (R^2, RMSE, MAPE) per device,
+- predicts latency and throughput for untested (N, num_iter, k) points,
+- solves for the CPU/GPU crossover batch size per num_iter (or reports
+  which device is faster at every batch size when the lines do not cross).
+
+The sweep CSV only covers k=512 (n=1024), so N and n cannot be told apart
+through the N*n terms: predictions for other code lengths are printed
+with an extrapolation warning.
+
+Example:
+    python3 ldpc_latency_model.py --csv-path ldpc_sionna_spark.csv \
+        --predict 1024,8 --predict 65536,12,1024 --crossover-iters 4 10 22
+"""
+
+import argparse
+import math
+
+import numpy as np
+import pandas as pd
+
+
+DEVICES = ("cpu", "gpu")
+COEF_NAMES = ("t_fixed_s", "t_cw_s", "t_iter_s")
+
+
+def design_matrix(num_codewords, n, num_iter) -> np.ndarray:
+    """Feature matrix [1, N*n, N*n*num_iter] for the latency model."""
+    num_codewords = np.asarray(num_codewords, dtype=np.float64)
+    n = np.asarray(n, dtype=np.float64)
+    num_iter = np.asarray(num_iter, dtype=np.float64)
+
+    bits = num_codewords * n
+    return np.column_stack([
+        np.ones_like(bits),
+        bits,
+        bits * num_iter,
+    ])
+
+
+def load_results(path: str = "ldpc_sionna_spark.csv") -> pd.DataFrame:
+    """Load the benchmark CSV, keeping only the columns the model needs."""
+    df = pd.read_csv(path)
+    cols = ["k", "n", "rate", "num_codewords", "num_iter",
+            "cpu_latency_s", "gpu_latency_s"]
+    missing = [c for c in cols if c not in df.columns]
+    if missing:
+        raise RuntimeError(f"CSV '{path}' is missing columns: {missing}")
+    return df[cols]
+
+
+def fit_device(df: pd.DataFrame, device: str) -> dict | None:
+    """
+    Fit the latency model for one device ("cpu" or "gpu").
+
+    Rows with a NaN or non-positive latency (e.g. --no-gpu runs) are dropped.
+    Returns None when there is not enough data to fit.
+    """
+    lat_col = f"{device}_latency_s"
+    sub = df[np.isfinite(df[lat_col]) & (df[lat_col] > 0)]
+    if len(sub) < len(COEF_NAMES):
+        return None
+
+    X = design_matrix(sub["num_codewords"], sub["n"], sub["num_iter"])
+    y = sub[lat_col].to_numpy(dtype=np.float64)
+
+    # Relative-error weighting: each row scaled by 1/y so that small batches
+    # (sub-ms latencies) count as much as the 20k-codeword ones.
+    w = 1.0 / y
+    coef, *_ = np.linalg.lstsq(X * w[:, None], y * w, rcond=None)
+
+    y_hat = X @ coef
+    resid = y - y_hat
+    ss_res = float(np.sum(resid ** 2))
+    ss_tot = float(np.sum((y - y.mean()) ** 2))
+
+    return {
+        "device": device,
+        "coef": coef,
+        "num_rows": len(sub),
+        "n_values": sorted(int(v) for v in sub["n"].unique()),
+        "r2": 1.0 - ss_res / ss_tot if ss_tot > 0 else float("nan"),
+        "rmse_s": math.sqrt(ss_res / len(sub)),
+        "mape_pct": float(np.mean(np.abs(resid / y)) * 100.0),
+    }
+
+
+def predict(model: dict,
+            num_codewords: int,
+            num_iter: int,
+            k: int,
+            rate: float) -> dict:
+    """Predict latency (s) and info-bit throughput (Mbit/s) for one point."""
+    n = int(k / rate)
+    latency_s = (design_matrix([num_codewords], [n], [num_iter]) @ model["coef"]).item()
+    if latency_s > 0:
+        throughput_mbps = num_codewords * k / latency_s / 1e6
+    else:
+        throughput_mbps = float("nan")
+    return {
+        "latency_s": latency_s,
+        "throughput_mbps": throughput_mbps,
+    }
+
+
+def crossover_batch_size(cpu_model: dict,
+                         gpu_model: dict,
+                         num_iter: int,
+                         n: int) -> tuple[float, str]:
+    """
+    Batch size N at which predicted CPU and GPU latencies are equal.
+
+    Returns (N, winner) where winner ("CPU" or "GPU") is the device that is
+    faster above N -- in both latency and throughput, since both devices
+    decode the same N codewords. If the lines do not cross at a positive
+    batch size, N is NaN and winner is the device that is faster at every
+    N > 0 ("" if the predicted latencies are identical).
+    """
+    a_c, b_c, c_c = cpu_model["coef"]
+    a_g, b_g, c_g = gpu_model["coef"]
+
+    slope_diff = ((b_c - b_g) + (c_c - c_g) * num_iter) * n
+    if slope_diff == 0:
+        # Parallel lines: the fixed cost alone decides, at every N
+        if a_c == a_g:
+            return float("nan"), ""
+        return float("nan"), ("GPU" if a_c > a_g else "CPU")
+
+    n_star = (a_g - a_c) / slope_diff
+    winner = "GPU" if slope_diff > 0 else "CPU"
+    # Crossing at N <= 0: every positive N is already above it
+    return (n_star if n_star > 0 else float("nan")), winner
+
+
+def extrapolation_warning(model: dict, n: int) -> str | None:
+    """
+    Warning text if n is not a code length the model was fitted on.
+
+    N and n only enter the model as N * n, so with a single fitted code
+    length the fit cannot tell n-scaling from batch-size scaling; other
+    code lengths are pure extrapolation.
+    """
+    if n in model["n_values"]:
+        return None
+    fitted = ", ".join(str(v) for v in model["n_values"])
+    return (f"WARNING: n={n} is outside the fitted code lengths (n={fitted}); "
+            f"the N*n terms cannot separate n-scaling from batch scaling, "
+            f"so this is an extrapolation.")
+
+
+def parse_point(text: str, default_k: int) -> tuple[int, int, int]:
+    """Parse 'N,num_iter[,k]' into a tuple of ints."""
+    parts = [p.strip() for p in text.split(",")]
+    if len(parts) not in (2, 3):
+        raise argparse.ArgumentTypeError(
+            f"Expected 'N,num_iter[,k]', got '{text}'."
+        )
+    try:
+        num_codewords = int(parts[0])
+        num_iter = int(parts[1])
+        k = int(parts[2]) if len(parts) == 3 else default_k
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"Expected integers 'N,num_iter[,k]', got '{text}'."
+        ) from None
+    return num_codewords, num_iter, k
+
+
+def print_fit(model: dict) -> None:
+    dev = model["device"].upper()
+    print(f"{dev}: fitted on {model['num_rows']} rows")
+    for name, value in zip(COEF_NAMES, model["coef"]):
+        print(f"    {name:10s} = {value:.4e}")
+    print(f"    R^2 = {model['r2']:.4f}, RMSE = {model['rmse_s'] * 1e3:.3f} ms, "
+          f"MAPE = {model['mape_pct']:.2f} %")
+    if len(model["n_values"]) == 1:
+        print(f"    (single code length n={model['n_values'][0]} in the data: "
+              f"predictions for other k / rate are extrapolation)")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fit a per-device LDPC5G latency model to sweep results."
+    )
+    parser.add_argument("--csv-path", type=str, default="ldpc_sionna_spark.csv",
+                        help="Benchmark CSV written by ldpc_cpu_gpu_benchmark.py.")
+    parser.add_argument("--k", type=int, default=512,
+                        help="Default k for --predict points that omit it.")
+    parser.add_argument("--rate", type=float, default=0.5,
+                        help="Code rate used to derive n for predictions.")
+    parser.add_argument("--predict", action="append", default=[],
+                        metavar="N,I[,K]",
+                        help="Predict latency/throughput at (N, num_iter[, k]). "
+                             "May be given multiple times.")
+    parser.add_argument("--crossover-iters", type=int, nargs="*",
+                        default=[4, 10, 22],
+                        help="num_iter values to solve the CPU/GPU crossover for.")
+
+    cfg = parser.parse_args()
+
+    df = load_results(cfg.csv_path)
+    print(f"Loaded {len(df)} rows from {cfg.csv_path}")
+    print()
+
+    models = {}
+    print("=== Fit ===")
+    for device in DEVICES:
+        model = fit_device(df, device)
+        if model is None:
+            print(f"{device.upper()}: not enough valid rows to fit.")
+            continue
+        models[device] = model
+        print_fit(model)
+    print()
+
+    # Parsed after parse_args() so that points without k can use --k
+    try:
+        points = [parse_point(p, cfg.k) for p in cfg.predict]
+    except argparse.ArgumentTypeError as e:
+        parser.error(f"argument --predict: {e}")
+    if points:
+        print("=== Predictions ===")
+        warned = set()
+        for num_codewords, num_iter, k in points:
+            n = int(k / cfg.rate)
+            for model in models.values():
+                msg = extrapolation_warning(model, n)
+                if msg and n not in warned:
+                    print(msg)
+                    warned.add(n)
+            line = f"N={num_codewords:6d}, I={num_iter:3d}, k={k:5d}:"
+            for device, model in models.items():
+                p = predict(model, num_codewords, num_iter, k, cfg.rate)
+                line += (f"  {device.upper()} {p['latency_s'] * 1e3:9.3f} ms "
+                         f"{p['throughput_mbps']:9.2f} Mbit/s")
+            print(line)
+        print()
+
+    if "cpu" in models and "gpu" in models:
+        n = int(cfg.k / cfg.rate)
+        print(f"=== CPU/GPU crossover (k={cfg.k}, n={n}) ===")
+        for model in (models["cpu"], models["gpu"]):
+            msg = extrapolation_warning(model, n)
+            if msg:
+                print(msg)
+                break
+        for num_iter in cfg.crossover_iters:
+            n_star, winner = crossover_batch_size(
+                models["cpu"], models["gpu"], num_iter, n
+            )
+            if math.isnan(n_star) and winner:
+                print(f"I={num_iter:3d}: no crossover at positive N; "
+                      f"{winner} is faster at every N")
+            elif math.isnan(n_star):
+                print(f"I={num_iter:3d}: no crossover; CPU and GPU predicted equal")
+            else:
+                print(f"I={num_iter:3d}: {winner} faster above N ~= {n_star:.0f} codewords")
+
+
+if __name__ == "__main__":
+    main()
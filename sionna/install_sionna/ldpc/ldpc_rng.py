@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+ldpc_rng.py
+
+Seeded, multithreaded generation of info bits and complex AWGN for the
+LDPC datasets, reproducible regardless of thread count.
+
+The TF path (BinarySource + awgn_manual) is unseeded and makes two
+separate tf.random.normal calls for the real and imaginary parts. Here:
+
+- Every call is split into fixed chunks of rows. Each chunk gets its own
+  independent stream (np.random.SeedSequence.spawn -> PCG64), so the
+  output depends only on (seed, call order, shape) -- never on how many
+  threads filled the chunks.
+- Chunks are filled in parallel by a thread pool; NumPy's Generator
+  releases the GIL while filling preallocated arrays.
+- Bits are drawn as random bytes (8 bits per draw) and unpacked;
+  bits_packed also returns the drawn bytes themselves, already in the
+  ldpc_bitpack layout, so callers never repack the info bits.
+- Complex AWGN is one standard_normal fill of interleaved float32 pairs,
+  viewed as complex64 (no second call, no tf.complex).
+
+Used by generate_dataset (ldpc_cpu_gpu_benchmark.py, --seed) and
+run_ber_sweep (sionna_e2e_ldpc_awgn.py, --seed).
+
+Run standalone to compare generation throughput against the TF path and
+check that output is identical across thread counts:
+    (sionna-gpu) python3 ldpc_rng.py --num-codewords 65536 --threads 1 4 8 20
+"""
+
+import argparse
+import hashlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class ParallelGenerator:
+    """
+    Deterministic parallel source of bits and complex AWGN.
+
+    seed       : base seed; the same seed and call sequence give the same data
+    num_threads: worker threads (output does not depend on this)
+    chunk_rows : rows per independent stream (output does depend on this)
+    """
+
+    def __init__(self, seed: int = 0, num_threads: int | None = None,
+                 chunk_rows: int = 1024):
+        self.seed = seed
+        self.num_threads = num_threads or os.cpu_count() or 1
+        self.chunk_rows = chunk_rows
+        self._root = np.random.SeedSequence(seed)
+        self._pool = ThreadPoolExecutor(max_workers=self.num_threads)
+
+    def _chunks(self, num_rows: int) -> list[tuple[int, int, np.random.Generator]]:
+        """(start, stop, generator) per chunk, with fresh streams for this call."""
+        call_ss = self._root.spawn(1)[0]
+        bounds = range(0, num_rows, self.chunk_rows)
+        children = call_ss.spawn(len(bounds))
+        return [
+            (start, min(start + self.chunk_rows, num_rows),
+             np.random.Generator(np.random.PCG64(ss)))
+            for start, ss in zip(bounds, children)
+        ]
+
+    def _run(self, fn, chunks) -> None:
+        # list() re-raises any worker exception here
+        list(self._pool.map(lambda c: fn(*c), chunks))
+
+    def bits(self, num_rows: int, k: int) -> np.ndarray:
+        """Uniform random bits, shape [num_rows, k], float32 (as BinarySource)."""
+        return self.bits_packed(num_rows, k)[0]
+
+    def bits_packed(self, num_rows: int, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Uniform random bits as (bits, packed): bits is [num_rows, k] float32
+        (same values as bits() for the same call), packed is the drawn
+        [num_rows, ceil(k/8)] uint8 bytes, MSB-first with the padding bits
+        of the last byte cleared -- identical to ldpc_bitpack.pack_bits(bits).
+        """
+        out = np.empty((num_rows, k), dtype=np.float32)
+        nbytes = (k + 7) // 8
+        packed = np.empty((num_rows, nbytes), dtype=np.uint8)
+        pad_mask = np.uint8((0xFF << (-k % 8)) & 0xFF)
+
+        def fill(start, stop, gen):
+            raw = packed[start:stop]
+            raw[...] = gen.integers(0, 256, size=(stop - start, nbytes), dtype=np.uint8)
+            raw[:, -1] &= pad_mask
+            out[start:stop] = np.unpackbits(raw, axis=-1, count=k)
+
+        self._run(fill, self._chunks(num_rows))
+        return out, packed
+
+    def awgn(self, shape: tuple[int, int], no: float) -> np.ndarray:
+        """
+        Complex AWGN of shape [rows, cols], complex64, variance No per
+        complex sample (No/2 per real dimension), matching awgn_manual.
+        """
+        rows, cols = shape
+        sigma = np.float32(np.sqrt(no / 2.0))
+        out = np.empty((rows, cols, 2), dtype=np.float32)
+
+        def fill(start, stop, gen):
+            block = out[start:stop]
+            gen.standard_normal(dtype=np.float32, out=block)
+            block *= sigma
+
+        self._run(fill, self._chunks(rows))
+        return out.view(np.complex64)[..., 0]
+
+    def close(self) -> None:
+        self._pool.shutdown()
+
+
+# ----------------------------------------------------------------------
+# Standalone throughput / determinism report
+# ----------------------------------------------------------------------
+
+def _digest(*arrays: np.ndarray) -> str:
+    h = hashlib.sha256()
+    for a in arrays:
+        h.update(np.ascontiguousarray(a).tobytes())
+    return h.hexdigest()[:16]
+
+
+def time_numpy(cfg, num_threads: int) -> dict:
+    gen = ParallelGenerator(cfg.seed, num_threads, cfg.chunk_rows)
+    n_sym = cfg.n // cfg.m
+
+    t0 = time.perf_counter()
+    u = gen.bits(cfg.num_codewords, cfg.k)
+    t1 = time.perf_counter()
+    w = gen.awgn((cfg.num_codewords, n_sym), cfg.no)
+    t2 = time.perf_counter()
+    gen.close()
+
+    return {
+        "bits_s": t1 - t0,
+        "awgn_s": t2 - t1,
+        "digest": _digest(u, w),
+    }
+
+
+def time_tf(cfg) -> dict:
+    """Current path: BinarySource bits + two tf.random.normal calls."""
+    import tensorflow as tf
+    from sionna.phy.mapping import BinarySource
+
+    source = BinarySource()
+    n_sym = cfg.n // cfg.m
+    sigma = np.sqrt(cfg.no / 2.0)
+
+    with tf.device("/CPU:0"):
+        # Warm-up (op setup), not timed
+        source([1, cfg.k]).numpy()
+
+        t0 = time.perf_counter()
+        u = source([cfg.num_codewords, cfg.k]).numpy()
+        t1 = time.perf_counter()
+        shape = [cfg.num_codewords, n_sym]
+        re = tf.random.normal(shape, stddev=sigma, dtype=tf.float32)
+        im = tf.random.normal(shape, stddev=sigma, dtype=tf.float32)
+        w = tf.complex(re, im).numpy()
+        t2 = time.perf_counter()
+
+    del u, w
+    return {"bits_s": t1 - t0, "awgn_s": t2 - t1}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Throughput and determinism of the parallel bit/AWGN generator."
+    )
+    parser.add_argument("--num-codewords", type=int, default=65536,
+                        help="Rows to generate per timing.")
+    parser.add_argument("--k", type=int, default=512,
+                        help="Info bits per codeword.")
+    parser.add_argument("--n", type=int, default=1024,
+                        help="Code bits per codeword (sets number of symbols).")
+    parser.add_argument("--m", type=int, default=4,
+                        help="Bits per QAM symbol.")
+    parser.add_argument("--no", type=float, default=0.1,
+                        help="Noise spectral density No.")
+    parser.add_argument("--seed", type=int, default=1234,
+                        help="Base seed.")
+    parser.add_argument("--chunk-rows", type=int, default=1024,
+                        help="Rows per independent stream.")
+    parser.add_argument("--threads", type=int, nargs="+",
+                        default=[1, 2, 4, os.cpu_count() or 1],
+                        help="Thread counts to compare.")
+    parser.add_argument("--no-tf", action="store_true",
+                        help="Skip the TensorFlow baseline.")
+
+    cfg = parser.parse_args()
+
+    bit_samples = cfg.num_codewords * cfg.k
+    awgn_samples = cfg.num_codewords * (cfg.n // cfg.m)
+
+    def report(name, res):
+        print(f"{name:14s} bits {bit_samples / res['bits_s'] / 1e6:9.1f} Msamples/s   "
+              f"AWGN {awgn_samples / res['awgn_s'] / 1e6:9.1f} Msamples/s"
+              + (f"   digest {res['digest']}" if "digest" in res else ""))
+
+    print(f"{cfg.num_codewords} codewords: {bit_samples} bits, "
+          f"{awgn_samples} complex noise samples")
+    print()
+
+    if not cfg.no_tf:
+        report("TF (current)", time_tf(cfg))
+
+    digests = set()
+    for num_threads in cfg.threads:
+        res = time_numpy(cfg, num_threads)
+        digests.add(res["digest"])
+        report(f"NumPy x{num_threads}", res)
+
+    print()
+    if len(digests) == 1:
+        print("Deterministic: identical output for all thread counts.")
+    else:
+        print("WARNING: output differs across thread counts!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+ldpc_shm_ring.py
+
+Zero-copy shared-memory ring of LLR batches for multi-process LDPC
+experiments on DGX Spark.
+
+- One producer process runs the generate_dataset chain from
+  ldpc_cpu_gpu_benchmark.py and writes each batch of (u, llr) straight
+  into a free slot of a multiprocessing.shared_memory block.
+- One or more consumer processes map the same block and decode each
+  full slot in place through NumPy views -- only slot indices travel
+  through the (free / full) queues, never the LLRs themselves.
+- Info bits are stored bit-packed (ldpc_bitpack.py), 8 per byte, and
+  errors are counted with XOR + popcount against the packed decoder output.
+- Reports slot occupancy, producer / consumer stall time, and either
+  handoff throughput (GB/s of LLRs, --no-decode) or decode throughput
+  (Mbit/s of info bits).
+- If the producer or a consumer dies, the remaining processes are
+  terminated and the run exits non-zero instead of hanging.
+
+The only copy of the LLR data is the producer's write of the TF output
+into its slot. Consumers hand the slot view to TF; on CPU,
+tf.convert_to_tensor may still copy it into a TF-owned buffer. With
+--no-decode the consumers only read the slot (a checksum), which
+measures the pure handoff cost.
+
+Example:
+    (sionna-gpu) python3 ldpc_shm_ring.py --slots 8 --batch 2048 \
+        --num-batches 64 --consumers 2 --num-iter 10
+"""
+
+import argparse
+import multiprocessing as mp
+import queue
+import sys
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from ldpc_bitpack import count_errors, pack_bits, packed_len
+
+
+class LLRRing:
+    """
+    Fixed-size ring of [batch, n] float32 LLR slots and [batch, ceil(k/8)]
+    bit-packed info-bit slots in one shared-memory block.
+
+    Slot ownership is handed over through two queues of slot indices:
+    free -> producer fills -> full -> consumer decodes -> free.
+    """
+
+    def __init__(self, slots: int, batch: int, k: int, n: int,
+                 name: str | None = None, ctx=None):
+        self.slots = slots
+        self.batch = batch
+        self.k = k
+        self.n = n
+
+        self.llr_bytes = slots * batch * n * np.dtype(np.float32).itemsize
+        size = self.llr_bytes + slots * batch * packed_len(k)
+
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            ctx = ctx or mp.get_context("spawn")
+            self.free_q = ctx.Queue()
+            self.full_q = ctx.Queue()
+            self.occupied = ctx.Value("i", 0)
+            for i in range(slots):
+                self.free_q.put(i)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        self.llr = np.ndarray((slots, batch, n), dtype=np.float32,
+                              buffer=self.shm.buf, offset=0)
+        self.u = np.ndarray((slots, batch, packed_len(k)), dtype=np.uint8,
+                            buffer=self.shm.buf, offset=self.llr_bytes)
+
+    def handle(self) -> dict:
+        """Picklable description for attaching from another process."""
+        return {
+            "slots": self.slots,
+            "batch": self.batch,
+            "k": self.k,
+            "n": self.n,
+            "name": self.shm.name,
+            "free_q": self.free_q,
+            "full_q": self.full_q,
+            "occupied": self.occupied,
+        }
+
+    @classmethod
+    def attach(cls, handle: dict) -> "LLRRing":
+        ring = cls(handle["slots"], handle["batch"], handle["k"], handle["n"],
+                   name=handle["name"])
+        ring.free_q = handle["free_q"]
+        ring.full_q = handle["full_q"]
+        ring.occupied = handle["occupied"]
+        return ring
+
+    # -- producer side -------------------------------------------------
+
+    def acquire_free(self) -> int:
+        return self.free_q.get()
+
+    def publish(self, slot: int) -> int:
+        """Mark slot as full; returns the occupancy after publishing."""
+        with self.occupied.get_lock():
+            self.occupied.value += 1
+            occ = self.occupied.value
+        self.full_q.put(slot)
+        return occ
+
+    # -- consumer side -------------------------------------------------
+
+    def acquire_full(self):
+        """Next full slot index, or None once the producer is done."""
+        return self.full_q.get()
+
+    def release(self, slot: int) -> None:
+        with self.occupied.get_lock():
+            self.occupied.value -= 1
+        self.free_q.put(slot)
+
+    def close(self) -> None:
+        # Drop the views before closing, or close() fails with exported buffers
+        del self.llr
+        del self.u
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+# ----------------------------------------------------------------------
+# Processes
+# ----------------------------------------------------------------------
+
+def producer(handle: dict, cfg_dict: dict, num_consumers: int, stats_q) -> None:
+    """Fill slots from the generate_dataset chain, then send stop markers."""
+    from ldpc_cpu_gpu_benchmark import build_chain, configure_tf, generate_dataset
+
+    cfg = argparse.Namespace(**cfg_dict)
+    configure_tf(cpu_threads=cfg.cpu_threads)
+    ring = LLRRing.attach(handle)
+    chain = build_chain(k=cfg.k, rate=cfg.rate, m=cfg.m, num_iter=cfg.num_iter)
+
+    gen_s = 0.0
+    stall_s = 0.0
+    occupancy = []
+
+    t_start = time.perf_counter()
+    for _ in range(cfg.num_batches):
+        t0 = time.perf_counter()
+        u_packed, llr_np = generate_dataset(chain, ring.batch, cfg.ebno_db,
+                                            verbose=False, packed=True)
+        t1 = time.perf_counter()
+        slot = ring.acquire_free()
+        t2 = time.perf_counter()
+
+        # The one copy: TF output -> shared slot
+        ring.llr[slot] = llr_np
+        ring.u[slot] = u_packed
+        occupancy.append(ring.publish(slot))
+
+        gen_s += t1 - t0
+        stall_s += t2 - t1
+    elapsed = time.perf_counter() - t_start
+
+    for _ in range(num_consumers):
+        ring.full_q.put(None)
+
+    stats_q.put({
+        "role": "producer",
+        "elapsed_s": elapsed,
+        "gen_s": gen_s,
+        "stall_s": stall_s,
+        "mean_occupancy": float(np.mean(occupancy)),
+        "max_occupancy": int(np.max(occupancy)),
+    })
+    ring.close()
+
+
+def consumer(handle: dict, cfg_dict: dict, idx: int, stats_q) -> None:
+    """Decode (or checksum) full slots in place until a stop marker arrives."""
+    cfg = argparse.Namespace(**cfg_dict)
+    ring = LLRRing.attach(handle)
+
+    decode_once = None
+    if cfg.decode:
+        import tensorflow as tf
+        from ldpc_cpu_gpu_benchmark import configure_tf, make_chain_cache
+
+        configure_tf(cpu_threads=cfg.cpu_threads)
+        cache = make_chain_cache(maxsize=1)
+        chain = cache.get(k=cfg.k, rate=cfg.rate, m=cfg.m, num_iter=cfg.num_iter)
+        decode_once = cache.decode_fn(chain, cfg.device)
+
+    batches = 0
+    bit_errors = 0
+    block_errors = 0
+    checksum = 0.0
+    work_s = 0.0
+    wait_s = 0.0
+    t_first = None
+
+    while True:
+        t0 = time.perf_counter()
+        slot = ring.acquire_full()
+        t1 = time.perf_counter()
+        if slot is None:
+            break
+        if t_first is None:
+            t_first = t1
+        else:
+            wait_s += t1 - t0
+
+        llr_view = ring.llr[slot]   # NumPy view into shared memory, no copy
+        u_view = ring.u[slot]
+        if decode_once is not None:
+            with tf.device(cfg.device):
+                u_hat = decode_once(tf.convert_to_tensor(llr_view)).numpy()
+            bits, blocks = count_errors(pack_bits(u_hat), u_view)
+            bit_errors += bits
+            block_errors += blocks
+        else:
+            checksum += float(llr_view.sum())
+        ring.release(slot)
+
+        work_s += time.perf_counter() - t1
+        batches += 1
+
+    stats_q.put({
+        "role": "consumer",
+        "idx": idx,
+        "batches": batches,
+        "work_s": work_s,
+        "wait_s": wait_s,
+        "active_s": (time.perf_counter() - t_first) if t_first else 0.0,
+        "bit_errors": bit_errors,
+        "block_errors": block_errors,
+        "checksum": checksum,
+    })
+    ring.close()
+
+
+# ----------------------------------------------------------------------
+# Main
+# ----------------------------------------------------------------------
+
+def collect_stats(procs: list, stats_q, poll_s: float = 1.0) -> list | None:
+    """
+    One stats dict per process, or None if any process died without
+    reporting (e.g. an exception in the producer or a consumer).
+
+    The queue is polled with a timeout so a crashed process cannot leave
+    the parent (and the surviving processes, blocked on the ring's
+    queues) waiting forever.
+    """
+    stats = []
+    while len(stats) < len(procs):
+        try:
+            stats.append(stats_q.get(timeout=poll_s))
+            continue
+        except queue.Empty:
+            pass
+        # A process that exited non-zero never sent (or never will send) stats
+        failed = [p for p in procs if p.exitcode not in (None, 0)]
+        if failed:
+            for p in failed:
+                print(f"ERROR: {p.name} exited with code {p.exitcode}")
+            return None
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Shared-memory LLR ring between generator and decoder processes."
+    )
+    parser.add_argument("--k", type=int, default=512,
+                        help="Number of information bits per codeword (k).")
+    parser.add_argument("--rate", type=float, default=0.5,
+                        help="LDPC code rate (k/n).")
+    parser.add_argument("--m", type=int, default=4,
+                        help="Bits per QAM symbol (4 -> 16-QAM).")
+    parser.add_argument("--ebno-db", type=float, default=4.0,
+                        help="Eb/N0 in dB for dataset generation.")
+    parser.add_argument("--num-iter", type=int, default=10,
+                        help="Number of LDPC decoder iterations.")
+    parser.add_argument("--slots", type=int, default=8,
+                        help="Number of ring slots.")
+    parser.add_argument("--batch", type=int, default=2048,
+                        help="Codewords per slot.")
+    parser.add_argument("--num-batches", type=int, default=64,
+                        help="Total batches the producer generates.")
+    parser.add_argument("--consumers", type=int, default=1,
+                        help="Number of decoder processes.")
+    parser.add_argument("--device", type=str, default="/CPU:0",
+                        help="TF device used by the decoder processes.")
+    parser.add_argument("--cpu-threads", type=int, default=None,
+                        help="Optional: limit TF CPU threads per process.")
+    parser.add_argument("--no-decode", dest="decode", action="store_false",
+                        help="Consumers only checksum the slots (pure handoff cost).")
+
+    cfg = parser.parse_args()
+
+    n = int(cfg.k / cfg.rate)
+    ctx = mp.get_context("spawn")
+    ring = LLRRing(cfg.slots, cfg.batch, cfg.k, n, ctx=ctx)
+    print(f"Ring: {cfg.slots} slots x {cfg.batch} codewords "
+          f"(k={cfg.k}, n={n}), {ring.shm.size / 2**20:.1f} MiB in '{ring.shm.name}'")
+
+    stats_q = ctx.Queue()
+    handle = ring.handle()
+    cfg_dict = vars(cfg)
+
+    procs = [ctx.Process(target=producer, name="producer",
+                         args=(handle, cfg_dict, cfg.consumers, stats_q))]
+    procs += [ctx.Process(target=consumer, name=f"consumer-{i}",
+                          args=(handle, cfg_dict, i, stats_q))
+              for i in range(cfg.consumers)]
+
+    t0 = time.perf_counter()
+    for p in procs:
+        p.start()
+    stats = collect_stats(procs, stats_q)
+    if stats is None:
+        for p in procs:
+            if p.is_alive():
+                p.terminate()
+        for p in procs:
+            p.join()
+        ring.close()
+        sys.exit(1)
+    for p in procs:
+        p.join()
+    wall_s = time.perf_counter() - t0
+    ring.close()
+
+    prod = next(s for s in stats if s["role"] == "producer")
+    cons = sorted((s for s in stats if s["role"] == "consumer"), key=lambda s: s["idx"])
+
+    total_batches = sum(s["batches"] for s in cons)
+    llr_bytes = total_batches * cfg.batch * n * 4
+    info_bits = total_batches * cfg.batch * cfg.k
+    active_s = max((s["active_s"] for s in cons), default=0.0)
+
+    print()
+    print("=== Producer ===")
+    print(f"Generate time : {prod['gen_s']:.3f} s")
+    print(f"Stalled (ring full): {prod['stall_s']:.3f} s")
+    print(f"Slot occupancy: mean {prod['mean_occupancy']:.2f}, "
+          f"max {prod['max_occupancy']} / {cfg.slots}")
+
+    print()
+    print("=== Consumers ===")
+    for s in cons:
+        line = (f"[{s['idx']}] {s['batches']} batches, work {s['work_s']:.3f} s, "
+                f"waited (ring empty) {s['wait_s']:.3f} s")
+        if cfg.decode:
+            line += (f", bit errors {s['bit_errors']}, "
+                     f"block errors {s['block_errors']}")
+        print(line)
+
+    print()
+    print("=== Throughput ===")
+    print(f"Wall time (incl. process start): {wall_s:.3f} s")
+    if active_s > 0:
+        if cfg.decode:
+            # active_s includes decode time, so it says nothing about the handoff
+            print(f"Decode            : {info_bits / active_s / 1e6:.2f} Mbit/s (info bits)")
+        else:
+            print(f"Copy-free handoff : {llr_bytes / active_s / 1e9:.2f} GB/s of LLRs")
+    print("\nDone.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+ldpc_sweep.py
+
+In-process (num_codewords x Eb/N0 x num_iter) sweep of the LDPC5G
+CPU/GPU benchmark, with one CSV row per point.
+
+sweep_ldpc.sh used to start a fresh ldpc_cpu_gpu_benchmark.py process
+per (N, I) point, paying the TF/Sionna import, the LDPC5G code
+construction and a fresh decoder trace every time. Here one process:
+
+- imports TF/Sionna once,
+- builds the (k, n, m) code once (ChainCache code level),
+- generates one dataset per (N, Eb/N0) and decodes it for every num_iter,
+- builds one decoder per num_iter and reuses its traced decode function
+  across batch sizes, Eb/N0 points and repetitions (ChainCache decoder
+  level; tf.function keeps one concrete graph per input shape).
+
+Rows use the same CSV layout as ldpc_cpu_gpu_benchmark.py. import_s is
+recorded on the first point only; build_chain_s and dataset_s are what
+each point actually paid (near zero on cache hits / reused datasets).
+peak_rss_mb is the sweep process' high-water mark up to that point.
+
+Progress is checkpointed after every point in the same KEY=VALUE format
+sweep_ldpc.sh sources, so an interrupted sweep resumes where it stopped.
+
+Example:
+    (sionna-gpu) python3 ldpc_sweep.py --num-codewords 2048 4096 8192 \
+        --num-iter 4 10 22 --reps 10 --csv-path ldpc_sionna_spark.csv
+"""
+
+import argparse
+import os
+import time
+
+# Must come before any TF import: the benchmark module times the TF/Sionna
+# import (IMPORT_S) and sets TF_CPP_MIN_LOG_LEVEL before loading TF
+from ldpc_cpu_gpu_benchmark import (
+    IMPORT_S,
+    append_results_to_csv,
+    benchmark_device,
+    configure_tf,
+    generate_dataset,
+    make_chain_cache,
+    print_env,
+)
+
+import tensorflow as tf
+from ldpc_demappers import DEMAPPER_BACKENDS
+from ldpc_rng import ParallelGenerator
+
+
+def load_checkpoint(path: str | None, default_ebno: float) -> tuple | None:
+    """Last completed (rep, N, ebno_db, I), or None if there is none."""
+    if not path or not os.path.exists(path):
+        return None
+    values = {}
+    with open(path) as f:
+        for line in f:
+            key, sep, value = line.strip().partition("=")
+            if sep:
+                values[key] = value
+    # Checkpoints from the per-process shell sweep have no Eb/N0 entry
+    return (int(values["LAST_REP"]), int(values["LAST_N"]),
+            float(values.get("LAST_EBNO", default_ebno)), int(values["LAST_I"]))
+
+
+def write_checkpoint(path: str | None, point: tuple) -> None:
+    if not path:
+        return
+    rep, n, ebno_db, i = point
+    with open(path, "w") as f:
+        f.write(f"LAST_REP={rep}\nLAST_N={n}\nLAST_EBNO={ebno_db}\nLAST_I={i}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="In-process LDPC5G CPU vs GPU sweep with chain / trace reuse."
+    )
+    parser.add_argument("--k", type=int, default=512,
+                        help="Number of information bits per codeword (k).")
+    parser.add_argument("--rate", type=float, default=0.5,
+                        help="LDPC code rate (k/n).")
+    parser.add_argument("--m", type=int, default=4,
+                        help="Bits per QAM symbol (4 -> 16-QAM).")
+    parser.add_argument("--num-codewords", type=int, nargs="+", required=True,
+                        help="Batch sizes N to sweep.")
+    parser.add_argument("--ebno-db", type=float, nargs="+", default=[4.0],
+                        help="Eb/N0 values (dB) to sweep.")
+    parser.add_argument("--num-iter", type=int, nargs="+", required=True,
+                        help="Decoder iteration counts to sweep.")
+    parser.add_argument("--reps", type=int, default=1,
+                        help="Repetitions of the whole grid.")
+    parser.add_argument("--repeat", type=int, default=10,
+                        help="Number of repeated decodes per device and point.")
+    parser.add_argument("--cpu-threads", type=int, default=None,
+                        help="Optional: limit TF CPU threads (Grace).")
+    parser.add_argument("--no-gpu", action="store_true",
+                        help="Skip GPU benchmark even if a GPU is present.")
+    parser.add_argument("--csv-path", type=str, default=None,
+                        help="If set, append one row per point to this CSV file.")
+    parser.add_argument("--checkpoint", type=str, default=None,
+                        help="KEY=VALUE checkpoint file for resuming the sweep.")
+    parser.add_argument("--demapper", type=str, default="app",
+                        choices=DEMAPPER_BACKENDS,
+                        help="Demapper backend for dataset generation.")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Seed for reproducible, multithreaded dataset "
+                             "generation (default: unseeded TF path).")
+    parser.add_argument("--gen-threads", type=int, default=None,
+                        help="Threads for seeded generation (default: all cores).")
+    parser.add_argument("--chain-cache-size", type=int, default=32,
+                        help="Max codes / decoders kept in the LRU chain cache.")
+
+    cfg = parser.parse_args()
+
+    configure_tf(cpu_threads=cfg.cpu_threads)
+    print_env()
+
+    use_gpu = not cfg.no_gpu and bool(tf.config.list_physical_devices("GPU"))
+    devices = ["/CPU:0"] + (["/GPU:0"] if use_gpu else [])
+
+    cache = make_chain_cache(cfg.demapper, maxsize=cfg.chain_cache_size)
+    rng = (ParallelGenerator(cfg.seed, num_threads=cfg.gen_threads)
+           if cfg.seed is not None else None)
+
+    done = load_checkpoint(cfg.checkpoint, cfg.ebno_db[0])
+    if done is not None:
+        print(f"Resuming after rep={done[0]}, N={done[1]}, "
+              f"Eb/N0={done[2]}, I={done[3]}")
+
+    import_s = IMPORT_S
+    num_points = 0
+    t_sweep = time.perf_counter()
+
+    for rep in range(1, cfg.reps + 1):
+        print(f"=== Repetition {rep}/{cfg.reps} ===")
+        for num_codewords in cfg.num_codewords:
+            for ebno_db in cfg.ebno_db:
+                todo = [i for i in cfg.num_iter
+                        if done is None or (rep, num_codewords, ebno_db, i) > done]
+                if not todo:
+                    continue
+
+                # One dataset per (N, Eb/N0), decoded at every num_iter
+                t0 = time.perf_counter()
+                code = cache.code(cfg.k, cfg.rate, cfg.m)
+                build_s = time.perf_counter() - t0
+
+                t0 = time.perf_counter()
+                _, llr_np = generate_dataset(code, num_codewords, ebno_db,
+                                             verbose=False, rng=rng)
+                dataset_s = time.perf_counter() - t0
+
+                for num_iter in todo:
+                    print(f"Running: num_codewords={num_codewords}, "
+                          f"Eb/N0={ebno_db} dB, num_iter={num_iter}, rep={rep}")
+                    point = argparse.Namespace(**{
+                        **vars(cfg),
+                        "num_codewords": num_codewords,
+                        "ebno_db": ebno_db,
+                        "num_iter": num_iter,
+                        "label": f"rep{rep}_N{num_codewords}_I{num_iter}",
+                    })
+
+                    t0 = time.perf_counter()
+                    chain = cache.get(cfg.k, cfg.rate, cfg.m, num_iter)
+                    build_s += time.perf_counter() - t0
+
+                    results = {
+                        dev.strip("/").split(":")[0].lower(): benchmark_device(
+                            dev, cache.decode_fn(chain, dev), llr_np, point)
+                        for dev in devices
+                    }
+                    phases = {
+                        "import_s": import_s,
+                        "build_chain_s": build_s,
+                        "dataset_s": dataset_s,
+                    }
+                    if cfg.csv_path:
+                        append_results_to_csv(cfg.csv_path, point, chain,
+                                              results, phases)
+
+                    write_checkpoint(cfg.checkpoint,
+                                     (rep, num_codewords, ebno_db, num_iter))
+                    num_points += 1
+                    # Paid once per process / per (N, Eb/N0) dataset
+                    import_s = build_s = dataset_s = 0.0
+
+                del llr_np
+
+    if rng is not None:
+        rng.close()
+
+    print()
+    print(f"Sweep complete: {num_points} points in "
+          f"{time.perf_counter() - t_sweep:.1f} s")
+    cache.print_stats()
+
+
+if __name__ == "__main__":
+    main()
@@ -10,12 +10,33 @@ Assumes the following files are in the current directory:
 Outputs:
     - fig_ldpc_throughput_vs_iter.png
     - fig_ldpc_resource_utilization.png
+
+Incremental mode (--incremental, optionally --watch SECONDS) for watching a
+running sweep: byte offsets, row counts and running aggregates for the three
+sources are kept in a JSON state file, so each pass only parses lines
+appended since the last one. The aggregates are bounded (sums / counts and
+fixed-bin histograms with min / max), so the state file does not grow with
+the sweep; a source file that does not exist yet simply contributes no rows,
+and one that is truncated or replaced (new inode or different header line,
+e.g. after a CSV header migration) triggers a rebuild from scratch. A figure is re-rendered only when one of its
+inputs gained rows, and independent figures render in parallel worker
+processes on the headless Agg backend.
 """
 
+import argparse
+import csv
+import io
+import json
+import os
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use("Agg")  # headless: figures are only ever saved to PNG
 import matplotlib.pyplot as plt
 
 
@@ -153,31 +174,19 @@ def plot_throughput_vs_iter(df: pd.DataFrame, out_path: str) -> None:
     plt.savefig(out_path, dpi=300)
     plt.close()
 
-def plot_resource_utilization(
-    gpu: pd.DataFrame,
-    cpu: pd.DataFrame,
-    out_path: str,
-) -> None:
-    """
-    Plot histograms of CPU core usage and GPU utilization during active periods.
-    """
-    # Active GPU samples: utilization > 5%
-    gpu_active = gpu[gpu["utilization.gpu [%]"] > 5]
-
-    # Active CPU samples: LDPC python process clearly running
-    cpu_active = cpu[cpu["cpu_total"] > 50]
-
+def _plot_resource_panels(draw_cpu, draw_gpu, out_path: str) -> None:
+    """Two-panel CPU / GPU utilization figure; draw_* fill one axis each."""
     fig, axes = plt.subplots(1, 2, figsize=(10, 4))
 
     # CPU histogram (in units of "active cores")
-    axes[0].hist(cpu_active["cpu_cores"], bins=20)
+    draw_cpu(axes[0])
     axes[0].set_xlabel("Approx. Grace CPU cores used\n(LDPC python3 process)")
     axes[0].set_ylabel("Count")
     axes[0].set_title("CPU utilization during LDPC sweep")
     axes[0].grid(True, axis="y")
 
     # GPU histogram (utilization percent)
-    axes[1].hist(gpu_active["utilization.gpu [%]"], bins=20)
+    draw_gpu(axes[1])
     axes[1].set_xlabel("GB10 GPU utilization [%]\n(nvidia-smi, active samples)")
     axes[1].set_ylabel("Count")
     axes[1].set_title("GPU utilization during LDPC sweep")
@@ -191,14 +200,379 @@ def plot_resource_utilization(
     fig.savefig(out_path, dpi=300)
     plt.close(fig)
 
+
+def plot_resource_utilization(
+    gpu: pd.DataFrame,
+    cpu: pd.DataFrame,
+    out_path: str,
+) -> None:
+    """
+    Plot histograms of CPU core usage and GPU utilization during active periods.
+    """
+    # Active GPU samples: utilization > 5%
+    gpu_active = gpu[gpu["utilization.gpu [%]"] > 5]
+
+    # Active CPU samples: LDPC python process clearly running
+    cpu_active = cpu[cpu["cpu_total"] > 50]
+
+    _plot_resource_panels(
+        lambda ax: ax.hist(cpu_active["cpu_cores"], bins=20),
+        lambda ax: ax.hist(gpu_active["utilization.gpu [%]"], bins=20),
+        out_path,
+    )
+
+
+def plot_resource_utilization_hist(
+    gpu_hist: dict,
+    cpu_hist: dict,
+    out_path: str,
+) -> None:
+    """
+    Same figure as plot_resource_utilization, drawn from fixed-bin
+    histogram aggregates (see empty_hist) instead of raw samples. The
+    x-range is limited to the bins between the observed min and max.
+    """
+    def draw(hist):
+        def _draw(ax):
+            edges = hist_edges(hist)
+            ax.hist(edges[:-1], bins=edges, weights=hist["counts"])
+            if hist["min"] is not None:
+                vmin = min(max(hist["min"], hist["lo"]), hist["hi"])
+                vmax = min(max(hist["max"], hist["lo"]), hist["hi"])
+                lo = edges[max(np.searchsorted(edges, vmin, side="right") - 1, 0)]
+                hi = edges[np.searchsorted(edges, vmax, side="left")]
+                if hi > lo:
+                    ax.set_xlim(lo, hi)
+        return _draw
+
+    _plot_resource_panels(draw(cpu_hist), draw(gpu_hist), out_path)
+
+# ----------------------------------------------------------------------
+# Incremental mode
+# ----------------------------------------------------------------------
+
+SOURCES = {
+    "ldpc": "ldpc_sionna_spark.csv",
+    "gpu": "gpu_ldpc_sweep_stats.csv",
+    "cpu": "pid_ldpc_sweep_stats.log",
+}
+
+FIGURES = {
+    "fig_ldpc_throughput_vs_iter.png": ("ldpc",),
+    "fig_ldpc_resource_utilization.png": ("gpu", "cpu"),
+}
+
+# Bump when the state layout changes; older state files are rebuilt
+STATE_VERSION = 3
+
+# Fixed histogram ranges for the utilization figure (Grace has 20 cores)
+CPU_CORES = 20
+HIST_BINS = 20
+
+
+def empty_hist(lo: float, hi: float, bins: int = HIST_BINS) -> dict:
+    """
+    Bounded running histogram: fixed bins over [lo, hi] (values outside
+    are clipped into the edge bins), plus min / max and [sum, count].
+    Its size does not grow with the number of samples.
+    """
+    return {"lo": lo, "hi": hi, "counts": [0] * bins,
+            "min": None, "max": None, "sum": [0.0, 0]}
+
+
+def hist_edges(hist: dict) -> np.ndarray:
+    return np.linspace(hist["lo"], hist["hi"], len(hist["counts"]) + 1)
+
+
+def hist_add(hist: dict, values) -> None:
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return
+    counts, _ = np.histogram(np.clip(values, hist["lo"], hist["hi"]),
+                             bins=len(hist["counts"]),
+                             range=(hist["lo"], hist["hi"]))
+    hist["counts"] = [int(a + b) for a, b in zip(hist["counts"], counts)]
+    vmin, vmax = float(values.min()), float(values.max())
+    hist["min"] = vmin if hist["min"] is None else min(hist["min"], vmin)
+    hist["max"] = vmax if hist["max"] is None else max(hist["max"], vmax)
+    hist["sum"][0] += float(values.sum())
+    hist["sum"][1] += int(values.size)
+
+
+def empty_state() -> dict:
+    """Fresh incremental state: nothing read, empty aggregates."""
+    return {
+        "version": STATE_VERSION,
+        "sources": {
+            name: {"offset": 0, "rows": 0, "header": None,
+                   "inode": None, "first_line": None}
+            for name in SOURCES
+        },
+        "ldpc": {
+            # num_iter -> [sum, count] per column (NaNs skipped, like .mean())
+            "by_iter": {},
+            "speedup": [0.0, 0],
+        },
+        "gpu": {
+            # Active samples only (util > 5%)
+            "active_util": empty_hist(0.0, 100.0),
+            "active_power": [0.0, 0],
+        },
+        "cpu": {
+            "cores": [0.0, 0],
+            # Active samples only (cpu_total > 50%), in cores
+            "active_cores": empty_hist(0.0, float(CPU_CORES)),
+        },
+    }
+
+
+def load_state(path: str) -> dict:
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            state = json.load(f)
+        if state.get("version") == STATE_VERSION:
+            return state
+        print(f"{path} is from an older version; rebuilding from scratch.")
+    return empty_state()
+
+
+def save_state(path: str, state: dict) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def read_new_lines(path: str, src: dict) -> list[str] | None:
+    """
+    Complete lines appended to path since src["offset"]; advances the offset.
+
+    A trailing partial line (still being written) is left for the next pass.
+    A file that does not exist (yet) has no new lines.
+    Returns None if the file was truncated or replaced since the offset was
+    taken: it shrank, its inode changed (e.g. the benchmark rewrote it via
+    os.replace to migrate the CSV header), or its first line (the header,
+    for CSVs) differs from the one remembered in src.
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return []
+
+    with f:
+        st = os.fstat(f.fileno())
+        first_line = f.readline()
+        first_complete = first_line.endswith(b"\n")
+        first_line = first_line.decode("utf-8", errors="replace")
+
+        if src["offset"] > 0:
+            if (st.st_size < src["offset"]
+                    or st.st_ino != src["inode"]
+                    or first_line != src["first_line"]):
+                return None
+        src["inode"] = st.st_ino
+        if first_complete:
+            src["first_line"] = first_line
+
+        f.seek(src["offset"])
+        data = f.read(st.st_size - src["offset"])
+
+    end = data.rfind(b"\n")
+    if end < 0:
+        return []
+    data = data[:end + 1]
+    src["offset"] += len(data)
+    return data.decode("utf-8", errors="replace").splitlines()
+
+
+def new_csv_rows(lines: list[str], src: dict) -> pd.DataFrame:
+    """Parse appended CSV lines using the header remembered in src."""
+    if src["header"] is None and lines:
+        src["header"] = next(csv.reader([lines[0]]))
+        lines = lines[1:]
+
+    lines = [ln for ln in lines if ln.strip()]
+    if not lines:
+        return pd.DataFrame(columns=src["header"] or [])
+
+    df = pd.read_csv(io.StringIO("\n".join(lines)), header=None, names=src["header"])
+    src["rows"] += len(df)
+    return df
+
+
+def _add(acc: list, values: pd.Series) -> None:
+    values = pd.to_numeric(values, errors="coerce").dropna()
+    acc[0] += float(values.sum())
+    acc[1] += int(values.size)
+
+
+def update_ldpc(state: dict, df: pd.DataFrame) -> None:
+    agg = state["ldpc"]
+    df = df.assign(speedup=df["throughput_speedup_gpu_over_cpu"])
+    for num_iter, grp in df.groupby("num_iter"):
+        entry = agg["by_iter"].setdefault(
+            str(int(num_iter)),
+            {"cpu_thr": [0.0, 0], "gpu_thr": [0.0, 0], "speedup": [0.0, 0]},
+        )
+        _add(entry["cpu_thr"], grp["cpu_throughput_mbps"])
+        _add(entry["gpu_thr"], grp["gpu_throughput_mbps"])
+        _add(entry["speedup"], grp["speedup"])
+    _add(agg["speedup"], df["speedup"])
+
+
+def update_gpu(state: dict, df: pd.DataFrame) -> None:
+    agg = state["gpu"]
+    df = df.rename(columns=lambda c: c.strip())
+    util = pd.to_numeric(df["utilization.gpu [%]"], errors="coerce")
+    active = df[util > 5]
+    hist_add(agg["active_util"], util[util > 5])
+    _add(agg["active_power"], active["power.draw [W]"])
+
+
+def update_cpu(state: dict, lines: list[str], date_str: str) -> int:
+    agg = state["cpu"]
+    totals = [rec["cpu_total"] for rec in
+              (parse_pid_line(line, date_str) for line in lines) if rec is not None]
+    if totals:
+        agg["cores"][0] += sum(totals) / 100.0
+        agg["cores"][1] += len(totals)
+        hist_add(agg["active_cores"], [t / 100.0 for t in totals if t > 50])
+    state["sources"]["cpu"]["rows"] += len(totals)
+    return len(totals)
+
+
+def _mean(acc: list) -> float:
+    return acc[0] / acc[1] if acc[1] else float("nan")
+
+
+def ldpc_agg_frame(state: dict) -> pd.DataFrame:
+    """One row per num_iter holding the running means (plot input)."""
+    rows = [
+        {
+            "num_iter": int(num_iter),
+            "cpu_throughput_mbps": _mean(e["cpu_thr"]),
+            "gpu_throughput_mbps": _mean(e["gpu_thr"]),
+            "speedup": _mean(e["speedup"]),
+        }
+        for num_iter, e in state["ldpc"]["by_iter"].items()
+    ]
+    return pd.DataFrame(rows).sort_values("num_iter")
+
+
+def render_figure(out_path: str, state: dict) -> str:
+    """Render one figure from the aggregates (runs in a worker process)."""
+    if out_path == "fig_ldpc_throughput_vs_iter.png":
+        plot_throughput_vs_iter(ldpc_agg_frame(state), out_path)
+    else:
+        plot_resource_utilization_hist(state["gpu"]["active_util"],
+                                       state["cpu"]["active_cores"], out_path)
+    return out_path
+
+
+def incremental_pass(state: dict, date_str: str) -> dict:
+    """
+    Consume new data from all sources, then re-render changed figures.
+
+    Returns a dict of source name -> rows added in this pass.
+    """
+    added = {}
+    for name, path in SOURCES.items():
+        src = state["sources"][name]
+        lines = read_new_lines(path, src)
+        if lines is None:
+            print(f"{path} was truncated or rewritten; "
+                  f"rebuilding all aggregates from scratch.")
+            state.clear()
+            state.update(empty_state())
+            return incremental_pass(state, date_str)
+
+        if name == "cpu":
+            added[name] = update_cpu(state, lines, date_str)
+            continue
+
+        df = new_csv_rows(lines, src)
+        added[name] = len(df)
+        if df.empty:
+            continue
+        if name == "ldpc":
+            update_ldpc(state, df)
+        else:
+            update_gpu(state, df)
+
+    stale = [
+        out for out, inputs in FIGURES.items()
+        if any(added[i] for i in inputs) or not os.path.exists(out)
+    ]
+    stale = [out for out in stale
+             if all(state["sources"][i]["rows"] for i in FIGURES[out])]
+
+    if stale:
+        with ProcessPoolExecutor(max_workers=len(stale)) as pool:
+            for out in pool.map(render_figure, stale, [state] * len(stale)):
+                print(f"Rendered {out}")
+
+    return added
+
+
+def print_incremental_summary(state: dict, added: dict) -> None:
+    rows = ", ".join(
+        f"{name} +{added[name]} ({state['sources'][name]['rows']} total)"
+        for name in SOURCES
+    )
+    print(f"[{datetime.now().isoformat(timespec='seconds')}] rows: {rows}")
+
+    print(f"Average GPU/CPU throughput speedup over all configs: "
+          f"{_mean(state['ldpc']['speedup']):.2f}×")
+    print(f"Mean cores used by LDPC python3 process: "
+          f"{_mean(state['cpu']['cores']):.1f} / 20")
+    print(
+        "GPU active-period stats: "
+        f"mean util={_mean(state['gpu']['active_util']['sum']):.1f}%, "
+        f"mean power={_mean(state['gpu']['active_power']):.2f} W"
+    )
+
+
+def run_incremental(state_path: str, date_str: str, watch: float | None) -> None:
+    state = load_state(state_path)
+    while True:
+        added = incremental_pass(state, date_str)
+        save_state(state_path, state)
+        print_incremental_summary(state, added)
+        if watch is None:
+            return
+        time.sleep(watch)
+
+
 # ----------------------------------------------------------------------
 # Main
 # ----------------------------------------------------------------------
 
 def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Post-process DGX Spark LDPC sweep outputs into figures."
+    )
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only consume data appended since the last run.")
+    parser.add_argument("--watch", type=float, default=None, metavar="SECONDS",
+                        help="With --incremental: repeat every SECONDS until Ctrl-C.")
+    parser.add_argument("--state-path", type=str,
+                        default="plot_ldpc_results.state.json",
+                        help="State file for --incremental.")
+    parser.add_argument("--date", type=str, default="2025-11-29",
+                        help="Date of the pidstat log (it only records times).")
+    cfg = parser.parse_args()
+
+    if cfg.incremental:
+        try:
+            run_incremental(cfg.state_path, cfg.date, cfg.watch)
+        except KeyboardInterrupt:
+            pass
+        return
+
     ldpc_df = load_ldpc_results("ldpc_sionna_spark.csv")
     gpu_df = load_gpu_stats("gpu_ldpc_sweep_stats.csv")
-    cpu_df = load_cpu_stats("pid_ldpc_sweep_stats.log", date_str="2025-11-29")
+    cpu_df = load_cpu_stats("pid_ldpc_sweep_stats.log", date_str=cfg.date)
 
     # Figure 1: throughput vs iterations
     plot_throughput_vs_iter(ldpc_df, "fig_ldpc_throughput_vs_iter.png")
@@ -17,6 +17,16 @@ NUM_ITER_VALUES=(
 # 10 repetitions per (N, I) pair -> 10 * 10 * 10 = 1000 rows
 REPS=10
 
+# Optional: set MEM_CAP_MB to drop num_codewords values that would not fit
+# under that memory cap (probed once up front by the benchmark itself).
+MEM_CAP_MB="${MEM_CAP_MB:-}"
+
+# By default the whole grid runs in ONE Python process (ldpc_sweep.py), so
+# the TF import, the LDPC5G code and the traced decoders are reused across
+# points. Set PER_PROCESS=1 to start a fresh benchmark process per point
+# instead (measures cold-start cost on every row).
+PER_PROCESS="${PER_PROCESS:-}"
+
 # Globals used for skip logic
 LAST_REP=0
 LAST_N=0
@@ -74,30 +84,75 @@ should_skip() {
   fi
 }
 
-load_checkpoint
+limit_batch_to_mem_cap() {
+  local probe cpu_max gpu_max max_n
+  echo "Probing max num_codewords under ${MEM_CAP_MB} MiB ..."
+  probe="$(python3 ldpc_cpu_gpu_benchmark.py \
+    --probe-max-batch --mem-cap-mb "${MEM_CAP_MB}" \
+    --num-iter "${NUM_ITER_VALUES[-1]}" | grep '^MAX_NUM_CODEWORDS_')"
+
+  cpu_max="$(sed -n 's/^MAX_NUM_CODEWORDS_CPU=//p' <<< "${probe}")"
+  gpu_max="$(sed -n 's/^MAX_NUM_CODEWORDS_GPU=//p' <<< "${probe}")"
+  max_n="${cpu_max}"
+  if [[ -n "${gpu_max}" ]] && (( gpu_max < max_n )); then
+    max_n="${gpu_max}"
+  fi
+  echo "Max num_codewords under cap: ${max_n}"
 
-for rep in $(seq 1 "${REPS}"); do
-  echo "=== Repetition ${rep}/${REPS} ==="
+  local kept=()
   for N in "${NUM_CODEWORDS_VALUES[@]}"; do
-    for I in "${NUM_ITER_VALUES[@]}"; do
-
-      if should_skip "${rep}" "${N}" "${I}"; then
-        # Already completed in a previous run; keep the sweep order, just don't rerun
-        continue
-      fi
-
-      echo "Running: num_codewords=${N}, num_iter=${I}, rep=${rep}"
-      python3 ldpc_cpu_gpu_benchmark.py \
-        --num-codewords "${N}" \
-        --num-iter "${I}" \
-        --repeat 10 \
-        --csv-path "${CSV}" \
-        --label "rep${rep}_N${N}_I${I}"
-
-      # Only reached if the python job succeeded (set -e), so it's safe to mark as done
-      write_checkpoint "${rep}" "${N}" "${I}"
+    if (( N <= max_n )); then
+      kept+=("${N}")
+    fi
+  done
+  if (( ${#kept[@]} == 0 )); then
+    echo "ERROR: no batch size fits under MEM_CAP_MB=${MEM_CAP_MB} MiB" \
+      "(max num_codewords under cap: ${max_n:-0}; smallest candidate:" \
+      "${NUM_CODEWORDS_VALUES[0]})." >&2
+    exit 1
+  fi
+  NUM_CODEWORDS_VALUES=("${kept[@]}")
+}
+
+load_checkpoint
+
+if [[ -n "${MEM_CAP_MB}" ]]; then
+  limit_batch_to_mem_cap
+fi
+
+if [[ -z "${PER_PROCESS}" ]]; then
+  python3 ldpc_sweep.py \
+    --num-codewords "${NUM_CODEWORDS_VALUES[@]}" \
+    --num-iter "${NUM_ITER_VALUES[@]}" \
+    --reps "${REPS}" \
+    --repeat 10 \
+    --csv-path "${CSV}" \
+    --checkpoint "${CHECKPOINT}"
+  load_checkpoint
+else
+  for rep in $(seq 1 "${REPS}"); do
+    echo "=== Repetition ${rep}/${REPS} ==="
+    for N in "${NUM_CODEWORDS_VALUES[@]}"; do
+      for I in "${NUM_ITER_VALUES[@]}"; do
+
+        if should_skip "${rep}" "${N}" "${I}"; then
+          # Already completed in a previous run; keep the sweep order, just don't rerun
+          continue
+        fi
+
+        echo "Running: num_codewords=${N}, num_iter=${I}, rep=${rep}"
+        python3 ldpc_cpu_gpu_benchmark.py \
+          --num-codewords "${N}" \
+          --num-iter "${I}" \
+          --repeat 10 \
+          --csv-path "${CSV}" \
+          --label "rep${rep}_N${N}_I${I}"
+
+        # Only reached if the python job succeeded (set -e), so it's safe to mark as done
+        write_checkpoint "${rep}" "${N}" "${I}"
+      done
     done
   done
-done
+fi
 
 echo "Sweep complete. Final checkpoint: rep=${LAST_REP}, N=${LAST_N}, I=${LAST_I}"
@@ -5,17 +5,35 @@ Minimal end-to-end Sionna sanity check on GB10:
 - Binary source -> LDPC5G encoder
 - 16-QAM mapper
 - AWGN (manual, in TF)
-- Demapper -> LDPC5G decoder
+- Demapper (selectable backend, --demapper) -> LDPC5G decoder
 - BER vs Eb/N0
-- Optional 3D constellation plotting
+- Optional 3D constellation plotting (matplotlib is imported lazily,
+  so --no-plot runs never pay for it)
+- Optional seeded, multithreaded bit/AWGN generation (--seed) via
+  ldpc/ldpc_rng.py, reproducible whatever the thread count
+- Per-phase timing: import, build_chain, plotting, BER sweep, and within
+  the sweep: dataset generation, first (tracing) decoder call, warm decode
+- Optional MCS grid (--mcs-grid) over several k / rate / modulation /
+  num_iter values, reusing built codes and traced decoders through the
+  LRU cache in ldpc/ldpc_chain_cache.py
 
 Run inside your sionna-gpu venv:
     (sionna-gpu) python3 sionna_e2e_ldpc_awgn.py
+    (sionna-gpu) python3 sionna_e2e_ldpc_awgn.py --no-plot   # headless
+    (sionna-gpu) python3 sionna_e2e_ldpc_awgn.py --no-plot --mcs-grid
 """
 
 import os
 os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"  # 0=all, 1=INFO off, 2=WARNING off, 3=ERROR off
 
+import time
+_IMPORT_T0 = time.perf_counter()
+
+import argparse
+import functools
+import itertools
+import sys
+
 import tensorflow as tf
 from absl import logging as absl_logging
 
@@ -26,14 +44,19 @@ import sionna
 from sionna.phy.mapping import (
     Constellation,
     Mapper,
-    Demapper,
     BinarySource,
 )
 from sionna.phy.fec.ldpc import LDPC5GEncoder, LDPC5GDecoder
 from sionna.phy.utils import ebnodb2no
 
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d import Axes3D  # noqa: F401
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "ldpc"))
+from ldpc_bitpack import tf_count_errors, tf_pack_bits  # noqa: E402
+from ldpc_chain_cache import ChainCache  # noqa: E402
+from ldpc_demappers import DEMAPPER_BACKENDS, make_demapper  # noqa: E402
+from ldpc_rng import ParallelGenerator  # noqa: E402
+
+# Wall time spent importing TF / Sionna (matplotlib is loaded on demand)
+IMPORT_S = time.perf_counter() - _IMPORT_T0
 
 
 def configure_tf():
@@ -57,35 +80,33 @@ def print_env_info():
     print()
 
 
-def build_chain(k=512, rate=0.5, num_bits_per_symbol=4):
+def build_code(k=512, rate=0.5, num_bits_per_symbol=4, demapper="app"):
     """
-    Build LDPC5G + 16QAM chain.
+    Build LDPC5G + 16QAM chain up to the encoder (no decoder).
 
     k   : info bits per codeword
     rate: k/n
     num_bits_per_symbol: 4 -> 16QAM
+    demapper: demapper backend, one of DEMAPPER_BACKENDS
     """
     n = int(k / rate)
     if n % num_bits_per_symbol != 0:
         raise ValueError("n must be divisible by num_bits_per_symbol for mapping.")
 
-    print(f"Using LDPC5G with k={k}, n={n}, rate={rate:.3f}, M=2^{num_bits_per_symbol} (16-QAM)")
+    print(f"Using LDPC5G with k={k}, n={n}, rate={rate:.3f}, "
+          f"M=2^{num_bits_per_symbol} ({2 ** num_bits_per_symbol}-QAM), "
+          f"demapper={demapper}")
 
     source = BinarySource()
     const = Constellation("qam", num_bits_per_symbol=num_bits_per_symbol)
     mapper = Mapper(constellation=const)
-    demapper = Demapper("app", constellation=const)
+    demapper = make_demapper(demapper, const)
 
     encoder = LDPC5GEncoder(
         k=k,
         n=n,
         num_bits_per_symbol=num_bits_per_symbol,
     )
-    decoder = LDPC5GDecoder(
-        encoder,
-        hard_out=True,     # return hard bits 0/1
-        num_iter=25,       # modest iteration count
-    )
 
     return {
         "source": source,
@@ -93,7 +114,6 @@ def build_chain(k=512, rate=0.5, num_bits_per_symbol=4):
         "mapper": mapper,
         "demapper": demapper,
         "encoder": encoder,
-        "decoder": decoder,
         "k": k,
         "n": n,
         "rate": rate,
@@ -101,6 +121,36 @@ def build_chain(k=512, rate=0.5, num_bits_per_symbol=4):
     }
 
 
+def build_decoder(encoder, num_iter=25):
+    """LDPC5G hard-decision decoder for an encoder's code."""
+    return LDPC5GDecoder(
+        encoder,
+        hard_out=True,     # return hard bits 0/1
+        num_iter=num_iter, # modest iteration count by default
+    )
+
+
+def build_chain(k=512, rate=0.5, num_bits_per_symbol=4, num_iter=25,
+                demapper="app"):
+    """
+    Build the full LDPC5G + 16QAM chain (code + decoder), uncached.
+
+    num_iter: LDPC decoder iterations; other arguments as in build_code.
+    """
+    chain = build_code(k, rate, num_bits_per_symbol, demapper=demapper)
+    chain["decoder"] = build_decoder(chain["encoder"], num_iter)
+    chain["num_iter"] = num_iter
+    return chain
+
+
+def sync_device():
+    """Block until all pending TF work has finished (no-op if unsupported)."""
+    try:
+        tf.experimental.async_wait()
+    except AttributeError:
+        pass
+
+
 def awgn_manual(x, no):
     """
     Complex AWGN with given noise spectral density No.
@@ -120,56 +170,136 @@ def awgn_manual(x, no):
     return tf.cast(x, tf.complex64) + w
 
 
-def run_ber_sweep(chain, ebno_dbs, batch_size=256, num_batches=40):
+def run_ber_sweep(chain, ebno_dbs, batch_size=256, num_batches=40, decode_fn=None,
+                  rng=None, timings=None):
     """
     Measure *info-bit* BER vs Eb/N0.
 
-    We compare decoded info bits vs original info bits (length k).
+    We compare decoded info bits vs original info bits (length k) with
+    XOR + popcount over packed bytes. The info bits are packed once when
+    they are generated (with rng, the generator's own bytes are used), so
+    per batch only the decoder output is packed. The error counters stay
+    on device and are read once per Eb/N0 point instead of syncing to the
+    host after every batch. ldpc/ldpc_bitpack.py, run standalone, times
+    this against the plain not_equal + count_nonzero comparison.
+
+    decode_fn: optional traced decoder (ChainCache.decode_fn); defaults to
+               calling chain["decoder"] eagerly.
+    rng: optional ParallelGenerator for seeded bits and AWGN; defaults to
+         the unseeded BinarySource / awgn_manual path.
+    timings: optional dict; if given, the device is synced around each
+             stage and the seconds spent are accumulated under "dataset"
+             (bits -> LLRs), "trace" (first decoder call) and "decode"
+             (warm decoder calls). Without it nothing is synced per batch.
     """
     source   = chain["source"]
     mapper   = chain["mapper"]
     demapper = chain["demapper"]
     encoder  = chain["encoder"]
-    decoder  = chain["decoder"]
+    decoder  = decode_fn if decode_fn is not None else chain["decoder"]
     k        = chain["k"]
     n        = chain["n"]
     rate     = chain["rate"]
     m        = chain["m"]
 
     ber_results = []
+    if timings is not None:
+        for name in ("dataset", "trace", "decode"):
+            timings.setdefault(name, 0.0)
+    first_call = True
 
     for ebno_db in ebno_dbs:
-        total_err  = 0
+        total_err  = tf.constant(0, dtype=tf.int64)
+        total_blk  = tf.constant(0, dtype=tf.int64)
         total_bits = 0
 
         # Compute No for this Eb/N0 (per complex dim)
         ebno_tf = tf.constant(ebno_db, dtype=tf.float32)
         no = ebnodb2no(ebno_tf, num_bits_per_symbol=m, coderate=rate)
+        no_host = float(no.numpy())
 
         for _ in range(num_batches):
             # Run the whole chain on GPU: u -> c -> s -> y -> llr -> u_hat
             with tf.device("/GPU:0"):
-                u = source([batch_size, k])   # (B, k)
+                t0 = time.perf_counter()
+                if rng is None:
+                    u = source([batch_size, k])   # (B, k)
+                    u_packed = tf_pack_bits(u)    # (B, k/8), packed at generation
+                else:
+                    u_np, u_packed_np = rng.bits_packed(batch_size, k)
+                    u = tf.constant(u_np)
+                    u_packed = tf.constant(u_packed_np)
                 c = encoder(u)                # (B, n)
                 s = mapper(c)                 # (B, n/m) complex
 
-                y   = awgn_manual(s, no)      # (B, n/m) complex
+                if rng is None:
+                    y = awgn_manual(s, no)    # (B, n/m) complex
+                else:
+                    y = s + rng.awgn((batch_size, n // m), no_host)
                 llr = demapper(y, no)         # (B, n) LLRs
-                u_hat = decoder(llr)          # (B, k) hard bits (info bits)
+                if timings is not None:
+                    sync_device()
+                    t1 = time.perf_counter()
+                    timings["dataset"] += t1 - t0
 
-            # Compare info bits
-            err = tf.math.count_nonzero(tf.not_equal(u_hat, u))
-            total_err  += int(err.numpy())
+                u_hat = decoder(llr)          # (B, k) hard bits (info bits)
+                if timings is not None:
+                    sync_device()
+                    timings["trace" if first_call else "decode"] += (
+                        time.perf_counter() - t1)
+                first_call = False
+
+                # Compare packed info bits (k/8 bytes per codeword)
+                bit_err, blk_err = tf_count_errors(tf_pack_bits(u_hat), u_packed)
+                total_err += bit_err
+                total_blk += blk_err
             total_bits += batch_size * k
 
-        ber = total_err / total_bits
+        ber = int(total_err.numpy()) / total_bits
+        bler = int(total_blk.numpy()) / (batch_size * num_batches)
         ber_results.append(ber)
-        print(f"Eb/N0 = {ebno_db:4.1f} dB : BER(info bits) = {ber:.3e}")
+        print(f"Eb/N0 = {ebno_db:4.1f} dB : BER(info bits) = {ber:.3e}, "
+              f"BLER = {bler:.3e}")
 
     return ber_results
 
+
+def run_mcs_grid(cache, ks, rates, ms, num_iters, ebno_dbs,
+                 batch_size=256, num_batches=20, rng=None):
+    """
+    BER sweep over every (k, rate, m, num_iter) in the grid.
+
+    Codes and traced decoders come from the shared ChainCache: a (k, rate, m)
+    code is built once for all num_iter values (innermost loop), and the
+    main sweep's configuration is not rebuilt or retraced if it is in the grid.
+    Combinations where n is not divisible by m are skipped.
+    """
+    results = {}
+    for k, rate, m, num_iter in itertools.product(ks, rates, ms, num_iters):
+        print(f"\n--- MCS: k={k}, rate={rate:.3f}, m={m}, num_iter={num_iter} ---")
+        try:
+            chain = cache.get(k, rate, m, num_iter)
+        except ValueError as e:
+            print("Skipping:", e)
+            continue
+
+        decode_fn = cache.decode_fn(chain, "/GPU:0")
+        results[(k, rate, m, num_iter)] = run_ber_sweep(
+            chain, ebno_dbs, batch_size=batch_size,
+            num_batches=num_batches, decode_fn=decode_fn, rng=rng,
+        )
+
+    print()
+    cache.print_stats()
+    return results
+
+
 def plot_constellation_3d(const):
     """Simple 3D scatter of the 16-QAM constellation."""
+    # Imported here so headless BER runs skip matplotlib/mplot3d entirely
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d import Axes3D  # noqa: F401
+
     pts = const.points.numpy()  # complex64
     x = np.real(pts)
     y = np.imag(pts)
@@ -187,24 +317,81 @@ def plot_constellation_3d(const):
 
 
 def main():
+    parser = argparse.ArgumentParser(
+        description="End-to-end Sionna LDPC5G + 16-QAM + AWGN sanity check."
+    )
+    parser.add_argument("--no-plot", action="store_true",
+                        help="Skip the 3D constellation plot (headless runs).")
+    parser.add_argument("--mcs-grid", action="store_true",
+                        help="Also run the BER sweep over an MCS grid.")
+    parser.add_argument("--grid-k", type=int, nargs="+", default=[256, 512, 1024],
+                        help="Info-bit lengths k for --mcs-grid.")
+    parser.add_argument("--grid-rate", type=float, nargs="+",
+                        default=[1 / 3, 1 / 2, 2 / 3],
+                        help="Code rates for --mcs-grid.")
+    parser.add_argument("--grid-m", type=int, nargs="+", default=[2, 4, 6],
+                        help="Bits per QAM symbol for --mcs-grid.")
+    parser.add_argument("--grid-num-iter", type=int, nargs="+", default=[10, 25],
+                        help="Decoder iterations for --mcs-grid.")
+    parser.add_argument("--demapper", type=str, default="app",
+                        choices=DEMAPPER_BACKENDS,
+                        help="Demapper backend (see ldpc/ldpc_demappers.py).")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Seed for reproducible, multithreaded bit/AWGN "
+                             "generation (default: unseeded TF path).")
+    parser.add_argument("--chain-cache-size", type=int, default=16,
+                        help="Max codes / decoders kept in the LRU chain cache.")
+    cfg = parser.parse_args()
+
     configure_tf()
     print_env_info()
 
+    phases = {"import": IMPORT_S}
+    rng = ParallelGenerator(cfg.seed) if cfg.seed is not None else None
+    cache = ChainCache(functools.partial(build_code, demapper=cfg.demapper),
+                       build_decoder, maxsize=cfg.chain_cache_size)
+
     # Build PHY chain
-    chain = build_chain(
+    t0 = time.perf_counter()
+    chain = cache.get(
         k=512,
         rate=0.5,
-        num_bits_per_symbol=4,  # 16-QAM
+        m=4,  # 16-QAM
+        num_iter=25,
     )
+    phases["build_chain"] = time.perf_counter() - t0
 
     # Optional: visually confirm Axes3D works and Sionna's constellation looks sane
-    print("\nPlotting 3D constellation (close the window to continue)...")
-    plot_constellation_3d(chain["const"])
+    if not cfg.no_plot:
+        print("\nPlotting 3D constellation (close the window to continue)...")
+        t0 = time.perf_counter()
+        plot_constellation_3d(chain["const"])
+        phases["plot"] = time.perf_counter() - t0
 
     # BER sweep
     print("\nRunning BER sweep (this will use the GB10)...")
     ebno_dbs = [0.0, 2.0, 4.0, 6.0, 8.0]
-    run_ber_sweep(chain, ebno_dbs, batch_size=256, num_batches=20)
+    t0 = time.perf_counter()
+    sweep_timings = {}
+    run_ber_sweep(chain, ebno_dbs, batch_size=256, num_batches=20,
+                  decode_fn=cache.decode_fn(chain, "/GPU:0"), rng=rng,
+                  timings=sweep_timings)
+    phases["ber_sweep"] = time.perf_counter() - t0
+    # Breakdown of ber_sweep (the rest is error counting and host reads)
+    phases["ber_dataset"] = sweep_timings["dataset"]
+    phases["ber_trace"] = sweep_timings["trace"]
+    phases["ber_decode"] = sweep_timings["decode"]
+
+    if cfg.mcs_grid:
+        print("\nRunning MCS grid BER sweep...")
+        t0 = time.perf_counter()
+        run_mcs_grid(cache, cfg.grid_k, cfg.grid_rate, cfg.grid_m,
+                     cfg.grid_num_iter, ebno_dbs, rng=rng)
+        phases["mcs_grid"] = time.perf_counter() - t0
+
+    print("\n=== Phase timings ===")
+    for name, seconds in phases.items():
+        print(f"{name:12s}: {seconds:.3f} s")
 
 
 if __name__ == "__main__":